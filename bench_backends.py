@@ -0,0 +1,154 @@
+import re
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+import locators
+import instagram
+import run_report
+import watermarks
+from selenium.webdriver.common.by import By
+
+
+# Local fixture mirroring the post page markup the primary locators expect,
+# so both backends run the real extraction/like path without touching Instagram.
+def _class_of(xpath):
+    return re.search(r"@class='([^']+)'", xpath).group(1)
+
+
+def build_fixture(n_comments, path):
+    block_class = _class_of(instagram.COMMENT_BLOCK_LOCATORS[0][2])
+    username_class = _class_of(instagram.USERNAME_LOCATORS[0][2])
+    container_class = _class_of(instagram.COMMENTS_CONTAINER_LOCATORS[0][2])
+    comments = []
+    for i in range(n_comments):
+        comments.append(f"""
+<div class="{block_class}">
+  <a href="/p/FIXTURE/c/{10_000 + i}/"><time datetime="2025-01-01T00:{i % 60:02d}:00Z">1w</time></a>
+  <span class="{username_class}">user_{i}</span>
+  <span class="x193iq5w xeuugli x1fj9vlw">fixture comment number {i} with some text</span>
+  <span class="xjkvuk6"><div role="button" onclick="toggleLike(this)"><svg aria-label="Like" width="12" height="12"><rect width="12" height="12"/></svg></div></span>
+</div>""")
+    html = f"""<!doctype html>
+<html><head><meta charset="utf-8"><title>fixture</title>
+<script>
+function toggleLike(button) {{
+  const svg = button.querySelector("svg");
+  svg.setAttribute("aria-label", svg.getAttribute("aria-label") === "Like" ? "Unlike" : "Like");
+}}
+</script></head>
+<body><div class="{container_class}" style="height:600px;overflow:auto">{''.join(comments)}</div></body></html>"""
+    with open(path, "w") as f:
+        f.write(html)
+    return "file://" + os.path.abspath(path)
+
+
+def selenium_driver(profile_dir):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    options = Options()
+    options.add_argument(f"--user-data-dir={profile_dir}")
+    options.add_argument("--headless=new")
+    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+
+def cdp_driver(profile_dir):
+    from cdp_backend import CdpDriver
+
+    return CdpDriver(profile_dir, headless=True)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run_flow(driver, url):
+    driver.get(url)
+    container = driver.find_element(By.XPATH, instagram.COMMENTS_CONTAINER_LOCATORS[0][2])
+    blocks = container.find_elements(By.XPATH, instagram.COMMENT_BLOCK_LOCATORS[0][2])
+    return instagram.scroll_and_like_comments(driver, container, blocks, max_scrolls=3, reply_depth=0)
+
+
+def bench_backend(name, factory, url, repeat):
+    profile_dir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    results = {}
+    start = time.perf_counter()
+    driver = factory(profile_dir)
+    results["startup (ms)"] = (time.perf_counter() - start) * 1000
+    try:
+        driver.get(url)
+        container = driver.find_element(By.XPATH, instagram.COMMENTS_CONTAINER_LOCATORS[0][2])
+        block_xpath = instagram.COMMENT_BLOCK_LOCATORS[0][2]
+        blocks = container.find_elements(By.XPATH, block_xpath)
+
+        results["execute_script round trip (ms)"] = timed(lambda: driver.execute_script("return 1;"), repeat * 20)
+        results["find comment blocks (ms)"] = timed(lambda: container.find_elements(By.XPATH, block_xpath), repeat)
+        results["username+text, 20 blocks (ms)"] = timed(
+            lambda: [(b.find_element(By.XPATH, instagram.USERNAME_LOCATORS[0][2]).text,
+                      b.find_element(By.XPATH, ".//span[contains(@class,'x193iq5w')]").text) for b in blocks[:20]],
+            repeat
+        )
+        like_buttons = [b.find_element(By.XPATH, instagram.LIKE_BUTTON_LOCATORS[0][2]) for b in blocks[:20]]
+        results["like click, 20 buttons (ms)"] = timed(lambda: [button.click() for button in like_buttons], repeat)
+
+        start = time.perf_counter()
+        liked = run_flow(driver, url)
+        results["scroll_and_like_comments (ms)"] = (time.perf_counter() - start) * 1000
+        results["comments liked by the flow"] = liked
+    finally:
+        driver.quit()
+        shutil.rmtree(profile_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the Selenium and direct CDP backends on a local fixture.")
+    parser.add_argument("--comments", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backends", default="selenium,cdp")
+    args = parser.parse_args()
+
+    # The flow's human-like pauses would swamp backend latency
+    instagram.human_sleep = lambda *a, **k: None
+    instagram.LONG_PAUSE_PROB = 0
+
+    workdir = tempfile.mkdtemp(prefix="bench_fixture_")
+    # Keep fixture-learned locator winners, watermarks and reports out of the real ones
+    locators.LOCATOR_CACHE_FILE = os.path.join(workdir, "locator_cache.json")
+    locators._winners = None
+    watermarks.WATERMARK_FILE = os.path.join(workdir, "comment_watermarks.json")
+    run_report.RUNS_DIR = os.path.join(workdir, "runs")
+    url = build_fixture(args.comments, os.path.join(workdir, "comments.html"))
+    factories = {"selenium": selenium_driver, "cdp": cdp_driver}
+
+    table = {}
+    for name in args.backends.split(","):
+        print(f"Benchmarking {name}...")
+        table[name] = bench_backend(name, factories[name], url, args.repeat)
+
+    rows = []
+    for results in table.values():
+        rows.extend(key for key in results if key not in rows)
+    names = list(table)
+    print(f"\n{'':<48}" + "".join(f"{n:>12}" for n in names))
+    for row in rows:
+        cells = "".join(f"{table[n][row]:>12.1f}" if row in table[n] else f"{'-':>12}" for n in names)
+        print(f"{row:<48}{cells}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
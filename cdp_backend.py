@@ -0,0 +1,577 @@
+# Direct Chrome DevTools Protocol backend: talks to Chrome over its DevTools
+# WebSocket instead of going through chromedriver, saving one HTTP hop per call.
+import os
+import json
+import time
+import shutil
+import itertools
+import threading
+import subprocess
+import urllib.request
+from contextlib import asynccontextmanager
+
+import trio
+from trio_websocket import open_websocket_url, ConnectionClosed
+
+try:
+    from selenium.common.exceptions import NoSuchElementException, JavascriptException, WebDriverException
+except ImportError:  # the backend itself doesn't need selenium
+    class WebDriverException(Exception):
+        pass
+
+    class NoSuchElementException(WebDriverException):
+        pass
+
+    class JavascriptException(WebDriverException):
+        pass
+
+
+CHROME_BINARY_ENV = "CHROME_BINARY"
+CHROME_CANDIDATES = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "C:/Program Files/Google/Chrome/Application/chrome.exe",
+]
+DEVTOOLS_STARTUP_TIMEOUT = 20     # seconds to wait for Chrome to expose its DevTools port
+COMMAND_TIMEOUT = 30              # seconds to wait for a single CDP response
+OBJECT_GROUP = "instagram_bot"    # remote objects are released per navigation
+MAX_MESSAGE_SIZE = 2 ** 28
+
+
+class CdpError(WebDriverException):
+    pass
+
+
+class _Subscription:
+    def __init__(self, session, method, buffer):
+        self.method = method
+        self.sender, self._receiver = trio.open_memory_channel(buffer)
+        session._listeners.setdefault(method, []).append(self.sender)
+
+    async def receive(self):
+        return await self._receiver.receive()
+
+
+class CdpSession:
+    """
+    Async CDP client bound to one page target. Create with open_cdp_session().
+    """
+
+    def __init__(self, ws):
+        self._ws = ws
+        self._ids = itertools.count(1)
+        self._pending = {}      # message id -> [trio.Event, response]
+        self._listeners = {}    # event method -> list of memory channel senders
+        self.closed = False
+
+    async def _reader(self):
+        try:
+            while True:
+                message = json.loads(await self._ws.get_message())
+                if "id" in message:
+                    waiter = self._pending.pop(message["id"], None)
+                    if waiter:
+                        waiter[1] = message
+                        waiter[0].set()
+                    continue
+                for channel in list(self._listeners.get(message.get("method"), [])):
+                    try:
+                        channel.send_nowait(message.get("params", {}))
+                    except (trio.WouldBlock, trio.BrokenResourceError):
+                        pass
+        except ConnectionClosed:
+            pass
+        finally:
+            self.closed = True
+            for waiter in self._pending.values():
+                waiter[1] = {"error": {"message": "DevTools connection closed"}}
+                waiter[0].set()
+            self._pending.clear()
+
+    async def send(self, method, params=None, timeout=COMMAND_TIMEOUT):
+        if self.closed:
+            raise CdpError("DevTools connection closed")
+        msg_id = next(self._ids)
+        waiter = [trio.Event(), None]
+        self._pending[msg_id] = waiter
+        await self._ws.send_message(json.dumps({"id": msg_id, "method": method, "params": params or {}}))
+        try:
+            with trio.fail_after(timeout):
+                await waiter[0].wait()
+        except trio.TooSlowError:
+            self._pending.pop(msg_id, None)
+            raise CdpError(f"{method} timed out after {timeout}s")
+        response = waiter[1]
+        if "error" in response:
+            raise CdpError(f"{method}: {response['error'].get('message')}")
+        return response.get("result", {})
+
+    def listen(self, method, buffer=256):
+        """
+        Subscribe to an event; returns a subscription with an async receive().
+        Call unlisten() when done.
+        """
+        return _Subscription(self, method, buffer)
+
+    def unlisten(self, subscription):
+        senders = self._listeners.get(subscription.method, [])
+        if subscription.sender in senders:
+            senders.remove(subscription.sender)
+
+    async def enable(self):
+        for domain in ("Page", "Runtime", "Network"):
+            await self.send(f"{domain}.enable")
+
+    async def navigate(self, url, wait_until="load", timeout=COMMAND_TIMEOUT):
+        """
+        Navigate and wait for "load", "domcontentloaded", or nothing (None).
+        """
+        await self.send("Runtime.releaseObjectGroup", {"objectGroup": OBJECT_GROUP})
+        event = {"load": "Page.loadEventFired", "domcontentloaded": "Page.domContentEventFired"}.get(wait_until)
+        receiver = self.listen(event) if event else None
+        try:
+            result = await self.send("Page.navigate", {"url": url}, timeout=timeout)
+            if result.get("errorText"):
+                raise CdpError(f"Navigation to {url} failed: {result['errorText']}")
+            if receiver is not None:
+                with trio.fail_after(timeout):
+                    await receiver.receive()
+        finally:
+            if receiver is not None:
+                self.unlisten(receiver)
+
+    async def reload(self, wait_until="load", timeout=COMMAND_TIMEOUT):
+        receiver = self.listen("Page.loadEventFired") if wait_until else None
+        try:
+            await self.send("Page.reload")
+            if receiver is not None:
+                with trio.fail_after(timeout):
+                    await receiver.receive()
+        finally:
+            if receiver is not None:
+                self.unlisten(receiver)
+
+    def _unwrap(self, result):
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            message = details.get("exception", {}).get("description") or details.get("text")
+            raise JavascriptException(message)
+        return result["result"]
+
+    async def evaluate(self, expression, await_promise=False, return_by_value=True, timeout=COMMAND_TIMEOUT):
+        """
+        Evaluate an expression in the page; returns its value (or the remote object).
+        """
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "awaitPromise": await_promise,
+            "returnByValue": return_by_value,
+            "objectGroup": OBJECT_GROUP,
+        }, timeout=timeout)
+        remote = self._unwrap(result)
+        return remote.get("value") if return_by_value else remote
+
+    async def call_function(self, object_id, declaration, args=(), await_promise=False, return_by_value=True,
+                            timeout=COMMAND_TIMEOUT):
+        """
+        Call a function with `this` bound to a remote object. args are CDP CallArguments.
+        """
+        result = await self.send("Runtime.callFunctionOn", {
+            "objectId": object_id,
+            "functionDeclaration": declaration,
+            "arguments": list(args),
+            "awaitPromise": await_promise,
+            "returnByValue": return_by_value,
+            "objectGroup": OBJECT_GROUP,
+        }, timeout=timeout)
+        remote = self._unwrap(result)
+        return remote.get("value") if return_by_value else remote
+
+    async def array_elements(self, object_id):
+        """
+        Object IDs of the entries of a remote array, in order.
+        """
+        result = await self.send("Runtime.getProperties", {"objectId": object_id, "ownProperties": True})
+        items = [(int(p["name"]), p["value"]["objectId"]) for p in result.get("result", [])
+                 if p["name"].isdigit() and p.get("value", {}).get("objectId")]
+        return [object_id for _, object_id in sorted(items)]
+
+    async def click(self, object_id):
+        """
+        Scroll the element into view and click its center with real mouse events.
+        """
+        point = await self.call_function(object_id, """function() {
+            this.scrollIntoView({block: 'center', inline: 'center'});
+            const r = this.getBoundingClientRect();
+            return (r.width && r.height) ? [r.left + r.width / 2, r.top + r.height / 2] : null;
+        }""")
+        if not point:
+            raise CdpError("element not interactable: it has no size")
+        x, y = point
+        await self.send("Input.dispatchMouseEvent", {"type": "mouseMoved", "x": x, "y": y})
+        for kind in ("mousePressed", "mouseReleased"):
+            await self.send("Input.dispatchMouseEvent", {"type": kind, "x": x, "y": y, "button": "left", "clickCount": 1})
+
+    async def get_cookies(self):
+        """
+        All browser cookies in Selenium's cookie dict format.
+        """
+        result = await self.send("Network.getAllCookies")
+        cookies = []
+        for c in result.get("cookies", []):
+            cookie = {k: c[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly") if k in c}
+            if c.get("expires", -1) > 0:
+                cookie["expiry"] = int(c["expires"])
+            cookies.append(cookie)
+        return cookies
+
+    async def set_cookies(self, cookies, url=None):
+        """
+        Set cookies given in Selenium's cookie dict format.
+        """
+        params = []
+        for c in cookies:
+            cookie = {k: c[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly") if k in c}
+            if "expiry" in c:
+                cookie["expires"] = c["expiry"]
+            if "domain" not in cookie and url:
+                cookie["url"] = url
+            params.append(cookie)
+        await self.send("Network.setCookies", {"cookies": params})
+
+
+@asynccontextmanager
+async def open_cdp_session(ws_url):
+    """
+    Connect to a DevTools WebSocket URL and yield a CdpSession.
+    """
+    async with open_websocket_url(ws_url, max_message_size=MAX_MESSAGE_SIZE) as ws:
+        async with trio.open_nursery() as nursery:
+            session = CdpSession(ws)
+            nursery.start_soon(session._reader)
+            try:
+                yield session
+            finally:
+                nursery.cancel_scope.cancel()
+
+
+def find_chrome_binary():
+    if os.environ.get(CHROME_BINARY_ENV):
+        return os.environ[CHROME_BINARY_ENV]
+    for candidate in CHROME_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    raise CdpError(f"Chrome not found; set {CHROME_BINARY_ENV}")
+
+
+def launch_chrome(user_data_dir, headless=False, extra_args=()):
+    """
+    Start Chrome with a DevTools port on the given profile. Returns (process, "host:port").
+    """
+    port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+    if os.path.exists(port_file):
+        os.remove(port_file)
+
+    args = [
+        find_chrome_binary(),
+        f"--user-data-dir={user_data_dir}",
+        "--remote-debugging-port=0",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--disable-blink-features=AutomationControlled",
+        "--log-level=3",
+    ]
+    if headless:
+        args.append("--headless=new")
+    args.extend(extra_args)
+    args.append("about:blank")
+
+    process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + DEVTOOLS_STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise CdpError(f"Chrome exited during startup (code {process.returncode})")
+        try:
+            with open(port_file, "r") as f:
+                port = f.readline().strip()
+            if port:
+                return process, f"127.0.0.1:{port}"
+        except FileNotFoundError:
+            pass
+        time.sleep(0.05)
+    process.kill()
+    raise CdpError("Timed out waiting for Chrome's DevTools port")
+
+
+def page_websocket_url(debugger_address):
+    """
+    WebSocket URL of the first page target on a Chrome DevTools endpoint.
+    """
+    with urllib.request.urlopen(f"http://{debugger_address}/json/list", timeout=5) as response:
+        targets = json.load(response)
+    for target in targets:
+        if target.get("type") == "page":
+            return target["webSocketDebuggerUrl"]
+    raise CdpError(f"No page target on {debugger_address}")
+
+
+class TrioLoopThread:
+    """
+    Runs a trio event loop in a daemon thread so synchronous code can await CDP calls.
+    """
+
+    def __init__(self):
+        self._token = None
+        self._nursery = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        try:
+            trio.run(self._main)
+        except BaseException:
+            # A dropped session crashes the loop; later calls see RunFinishedError
+            pass
+
+    async def _main(self):
+        self._token = trio.lowlevel.current_trio_token()
+        self._stop = trio.Event()
+        async with trio.open_nursery() as nursery:
+            self._nursery = nursery
+            self._ready.set()
+            await self._stop.wait()
+            nursery.cancel_scope.cancel()
+
+    async def _hold_session(self, ws_url, task_status=trio.TASK_STATUS_IGNORED):
+        async with open_cdp_session(ws_url) as session:
+            task_status.started(session)
+            await trio.sleep_forever()
+
+    def run(self, async_fn, *args):
+        try:
+            return trio.from_thread.run(async_fn, *args, trio_token=self._token)
+        except trio.RunFinishedError:
+            raise CdpError("DevTools event loop is no longer running")
+
+    def open_session(self, ws_url):
+        return self.run(self._nursery.start, self._hold_session, ws_url)
+
+    def stop(self):
+        try:
+            trio.from_thread.run_sync(self._stop.set, trio_token=self._token)
+        except trio.RunFinishedError:
+            pass
+        self._thread.join(timeout=5)
+
+
+# Wraps a WebDriver-style script body so arguments[] can hold elements (and lists
+# of elements): element placeholders in the JSON template are swapped for the
+# remote objects passed alongside it.
+_ARGS_WRAPPER = """function(template, ...elements) {
+    const resolve = v => Array.isArray(v) ? v.map(resolve)
+        : (v && typeof v === "object" && "__cdp_element__" in v) ? elements[v.__cdp_element__] : v;
+    const args = template.map(resolve);
+    %s
+}"""
+_SYNC_CALL = "return (function() { %s }).apply(window, args);"
+_ASYNC_CALL = "return new Promise(resolve => (function() { %s }).apply(window, args.concat([resolve])));"
+
+_FIND_JS = """function(by, value, single) {
+    const root = (this && this.nodeType) ? this : document;
+    let found = [];
+    if (by === "xpath") {
+        const snap = document.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < snap.snapshotLength; i++) found.push(snap.snapshotItem(i));
+    } else if (by === "tag name") {
+        found = Array.from(root.getElementsByTagName(value));
+    } else {
+        found = Array.from(root.querySelectorAll(value));
+    }
+    return single ? (found[0] || null) : found;
+}"""
+
+# Selenium locator strategies that map onto CSS selectors
+_CSS_STRATEGIES = {
+    "id": lambda v: f"[id={json.dumps(v)}]",
+    "name": lambda v: f"[name={json.dumps(v)}]",
+    "class name": lambda v: "." + v.strip().replace(" ", "."),
+    "css selector": lambda v: v,
+}
+
+
+def _locator(by, value):
+    if by in ("xpath", "tag name"):
+        return by, value
+    if by in _CSS_STRATEGIES:
+        return "css selector", _CSS_STRATEGIES[by](value)
+    raise CdpError(f"Unsupported locator strategy: {by}")
+
+
+class CdpElement:
+    """
+    Selenium WebElement look-alike backed by a CDP remote object.
+    """
+
+    def __init__(self, driver, object_id):
+        self._driver = driver
+        self.object_id = object_id
+
+    def _call(self, declaration, *values):
+        args = [{"value": v} for v in values]
+        return self._driver._run(self._driver.session.call_function, self.object_id, declaration, args)
+
+    def find_elements(self, by, value):
+        return self._driver._find(self.object_id, by, value, single=False)
+
+    def find_element(self, by, value):
+        return self._driver._find(self.object_id, by, value, single=True)
+
+    @property
+    def text(self):
+        return self._call("function() { return this.innerText || ''; }")
+
+    @property
+    def tag_name(self):
+        return self._call("function() { return this.tagName.toLowerCase(); }")
+
+    def get_attribute(self, name):
+        return self._call("function(name) { const v = this.getAttribute(name); return v !== null ? v : (this[name] ?? null); }", name)
+
+    def is_displayed(self):
+        return self._call("""function() {
+            const r = this.getBoundingClientRect();
+            const s = getComputedStyle(this);
+            return r.width > 0 && r.height > 0 && s.visibility !== 'hidden' && s.display !== 'none';
+        }""")
+
+    def click(self):
+        self._driver._run(self._driver.session.click, self.object_id)
+
+    def __eq__(self, other):
+        return isinstance(other, CdpElement) and other.object_id == self.object_id
+
+    def __hash__(self):
+        return hash(self.object_id)
+
+
+class CdpDriver:
+    """
+    Subset of the Selenium WebDriver API on top of a direct CDP session.
+    Script return values are passed by value (DOM nodes aren't returned as elements).
+    """
+
+    def __init__(self, user_data_dir, headless=False, page_load_strategy="normal", extra_args=()):
+        self.process, self.debugger_address = launch_chrome(user_data_dir, headless=headless, extra_args=extra_args)
+        self.page_load_strategy = page_load_strategy
+        self.script_timeout = COMMAND_TIMEOUT
+        self.page_load_timeout = COMMAND_TIMEOUT
+        self._loop = TrioLoopThread()
+        try:
+            self.session = self._loop.open_session(page_websocket_url(self.debugger_address))
+            self._run(self.session.enable)
+        except Exception:
+            self.quit()
+            raise
+
+    def _run(self, async_fn, *args):
+        return self._loop.run(async_fn, *args)
+
+    @property
+    def _wait_until(self):
+        return {"normal": "load", "eager": "domcontentloaded"}.get(self.page_load_strategy)
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    def get(self, url):
+        self._run(self.session.navigate, url, self._wait_until, self.page_load_timeout)
+
+    def refresh(self):
+        self._run(self.session.reload, self._wait_until, self.page_load_timeout)
+
+    @property
+    def current_url(self):
+        return self._run(self.session.evaluate, "location.href")
+
+    @property
+    def title(self):
+        return self._run(self.session.evaluate, "document.title")
+
+    def _script(self, body, args, asynchronous):
+        template, elements = [], []
+
+        def encode(value):
+            if isinstance(value, CdpElement):
+                elements.append(value)
+                return {"__cdp_element__": len(elements) - 1}
+            if isinstance(value, (list, tuple)):
+                return [encode(v) for v in value]
+            return value
+
+        template = [encode(a) for a in args]
+        call = (_ASYNC_CALL if asynchronous else _SYNC_CALL) % body
+        declaration = _ARGS_WRAPPER % call
+
+        if elements:
+            cdp_args = [{"value": template}] + [{"objectId": e.object_id} for e in elements]
+            return self._run(self.session.call_function, elements[0].object_id, declaration, cdp_args,
+                             asynchronous, True, self.script_timeout)
+        expression = f"({declaration})({json.dumps(template)})"
+        return self._run(self.session.evaluate, expression, asynchronous, True, self.script_timeout)
+
+    def execute_script(self, script, *args):
+        return self._script(script, args, asynchronous=False)
+
+    def execute_async_script(self, script, *args):
+        return self._script(script, args, asynchronous=True)
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self._run(self.session.send, cmd, cmd_args)
+
+    def _find(self, object_id, by, value, single):
+        by, value = _locator(by, value)
+        args = [{"value": by}, {"value": value}, {"value": single}]
+        if object_id is None:
+            expression = f"({_FIND_JS}).call(document, {json.dumps(by)}, {json.dumps(value)}, {json.dumps(single)})"
+            remote = self._run(self.session.evaluate, expression, False, False)
+        else:
+            remote = self._run(self.session.call_function, object_id, _FIND_JS, args, False, False)
+
+        if single:
+            if remote.get("subtype") == "null" or "objectId" not in remote:
+                raise NoSuchElementException(f"no element for {by}: {value}")
+            return CdpElement(self, remote["objectId"])
+        ids = self._run(self.session.array_elements, remote["objectId"])
+        return [CdpElement(self, i) for i in ids]
+
+    def find_element(self, by, value):
+        return self._find(None, by, value, single=True)
+
+    def find_elements(self, by, value):
+        return self._find(None, by, value, single=False)
+
+    def get_cookies(self):
+        return self._run(self.session.get_cookies)
+
+    def add_cookie(self, cookie):
+        self._run(self.session.set_cookies, [cookie], self.current_url)
+
+    def quit(self):
+        try:
+            self._loop.stop()
+        except Exception:
+            pass
+        try:
+            self.process.terminate()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
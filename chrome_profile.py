@@ -0,0 +1,180 @@
+import os
+import sys
+import json
+import time
+import shutil
+import getpass
+import tempfile
+
+
+PROFILE_DIR_ENV = "INSTAGRAM_BOT_PROFILE_DIR"   # overrides the golden profile location
+SNAPSHOT_ROOT = "/dev/shm"                      # tmpfs; falls back to the system temp dir
+STARTUP_LOG_FILE = "startup_times.jsonl"
+
+# Paths inside the user data dir that carry login/session state.
+# Everything else (caches, GPU/shader caches, history, extensions) is left out.
+SESSION_STATE_PATHS = [
+    "Local State",
+    "Default/Preferences",
+    "Default/Cookies",
+    "Default/Cookies-journal",
+    "Default/Network/Cookies",
+    "Default/Network/Cookies-journal",
+    "Default/Local Storage",
+]
+
+
+def default_profile_dir():
+    """
+    Location of the dedicated (golden) Chrome profile for the bot on this platform.
+    """
+    if os.environ.get(PROFILE_DIR_ENV):
+        return os.environ[PROFILE_DIR_ENV]
+
+    user = getpass.getuser()
+    if sys.platform == "darwin":
+        return f"/Users/{user}/Library/Application Support/Google/Chrome/Instagram_Bot"
+    if sys.platform.startswith("win"):
+        return f"C:/Users/{user}/AppData/Local/Google/Chrome/Instagram_Bot"
+    return os.path.join(os.path.expanduser("~"), ".config", "google-chrome", "Instagram_Bot")
+
+
+def _copy_path(src, dst):
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, dirs_exist_ok=True)
+    elif os.path.isfile(src):
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copy2(src, dst)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def copy_session_state(src_dir, dst_dir):
+    """
+    Copy only SESSION_STATE_PATHS from one user data dir to another.
+    """
+    for rel in SESSION_STATE_PATHS:
+        _copy_path(os.path.join(src_dir, rel), os.path.join(dst_dir, rel))
+
+
+def compact_profile(profile_dir=None):
+    """
+    Prune the golden profile down to session state, dropping caches and everything else.
+    The pruned copy is built next to the profile and swapped in with renames, so the
+    original is left untouched if anything fails. Chrome must not be running on it.
+    """
+    profile_dir = os.path.normpath(profile_dir or default_profile_dir())
+    if not os.path.isdir(profile_dir):
+        print(f"No profile at {profile_dir}")
+        return
+    before = _dir_size(profile_dir)
+    pruned = profile_dir + ".compact"
+    retired = profile_dir + ".old"
+    # Leftovers from an interrupted compaction; the live profile still exists at this point
+    shutil.rmtree(pruned, ignore_errors=True)
+    shutil.rmtree(retired, ignore_errors=True)
+    try:
+        os.makedirs(pruned)
+        copy_session_state(profile_dir, pruned)
+    except Exception:
+        shutil.rmtree(pruned, ignore_errors=True)
+        raise
+
+    # A directory can't be replaced while it has contents: move the original aside first
+    os.replace(profile_dir, retired)
+    try:
+        os.replace(pruned, profile_dir)
+    except Exception:
+        os.replace(retired, profile_dir)
+        raise
+    shutil.rmtree(retired, ignore_errors=True)
+    print(f"Compacted profile {profile_dir}: {before / 1e6:.1f} MB -> {_dir_size(profile_dir) / 1e6:.1f} MB")
+
+
+def snapshot_profile(profile_dir=None):
+    """
+    Copy the session state of the golden profile to tmpfs and return the snapshot dir.
+    """
+    profile_dir = profile_dir or default_profile_dir()
+    os.makedirs(profile_dir, exist_ok=True)
+    root = SNAPSHOT_ROOT if os.path.isdir(SNAPSHOT_ROOT) else None
+    snapshot_dir = tempfile.mkdtemp(prefix="instagram_bot_profile_", dir=root)
+    copy_session_state(profile_dir, snapshot_dir)
+    print(f"Profile snapshot at {snapshot_dir} ({_dir_size(snapshot_dir) / 1e6:.1f} MB)")
+    return snapshot_dir
+
+
+def write_back_session(snapshot_dir, profile_dir=None):
+    """
+    Persist cookies/local storage from a snapshot back into the golden profile.
+    """
+    profile_dir = profile_dir or default_profile_dir()
+    try:
+        copy_session_state(snapshot_dir, profile_dir)
+        print(f"Wrote session state back to {profile_dir}")
+    except Exception as e:
+        print(f"Error writing session state back: {e}")
+
+
+def release_snapshot(driver, profile_dir=None):
+    """
+    Quit the browser running on a snapshot, write its session state back and delete it.
+    No-op for drivers launched directly on the golden profile.
+    """
+    snapshot_dir = getattr(driver, "profile_snapshot_dir", None)
+    if not snapshot_dir:
+        return
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    write_back_session(snapshot_dir, profile_dir)
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+    driver.profile_snapshot_dir = None
+
+
+def discard_snapshot(driver):
+    """
+    Delete a driver's snapshot without writing anything back (e.g. after a crash).
+    """
+    snapshot_dir = getattr(driver, "profile_snapshot_dir", None)
+    if snapshot_dir:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        driver.profile_snapshot_dir = None
+
+
+def record_startup_time(mode, seconds, path=STARTUP_LOG_FILE):
+    print(f"Chrome startup: {seconds:.2f}s ({mode})")
+    try:
+        with open(path, "a") as f:
+            f.write(json.dumps({"mode": mode, "seconds": round(seconds, 3), "at": time.time()}) + "\n")
+    except Exception as e:
+        print(f"Error recording startup time: {e}")
+
+
+def startup_report(path=STARTUP_LOG_FILE):
+    """
+    Print mean/min startup time per launch mode ("snapshot" vs "direct").
+    """
+    by_mode = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                entry = json.loads(line)
+                by_mode.setdefault(entry["mode"], []).append(entry["seconds"])
+    except FileNotFoundError:
+        print("No startup times recorded yet.")
+        return {}
+
+    for mode, times in sorted(by_mode.items()):
+        print(f"{mode:>10}: {len(times)} launches | mean {sum(times) / len(times):.2f}s | min {min(times):.2f}s")
+    return by_mode
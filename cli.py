@@ -0,0 +1,139 @@
+# Command line entry point for the post and reel likers. Selenium and the liker
+# scripts are imported only by the commands that start a browser (run, scan,
+# resume), so validate and report don't pay for them.
+import sys
+import argparse
+import importlib
+
+from links import read_video_links, shortcode_from_link
+from run_report import load_run_report, completed_links, summarize_ready_times, summarize_scan
+
+
+DEFAULT_LINKS_FILE = "video_links.txt"
+SCRIPTS = {"post": "instagram", "reel": "instagram_reels"}
+
+
+def _load_script(kind, script=None):
+    # Importing a liker script pulls in Selenium; only browser commands get here
+    return script or importlib.import_module(SCRIPTS[kind])
+
+
+def _read_links(path):
+    links = read_video_links(path)
+    if not links:
+        print(f"No valid links provided. Please add links to {path} or check your internet connection.")
+    return links
+
+
+def cmd_validate(args, script=None):
+    links = _read_links(args.links)
+    for link in links:
+        print(f"  {link}")
+    return 0 if links else 1
+
+
+def cmd_run(args, script=None, dry_run=False):
+    links = _read_links(args.links)
+    if not links:
+        return 1
+    _load_script("reel" if args.reels else "post", script).like_comments(links, run_id=args.run_id, dry_run=dry_run)
+    return 0
+
+
+def cmd_scan(args, script=None):
+    return cmd_run(args, script, dry_run=True)
+
+
+def cmd_resume(args, script=None):
+    report = load_run_report(args.run_id)
+    if report is None:
+        print("No run report to resume.")
+        return 1
+    links = _read_links(args.links)
+    done = completed_links(report)
+    remaining = [link for link in links if shortcode_from_link(link) not in done]
+    print(f"Resuming run {report['run_id']}: {len(done)} links done, {len(remaining)} remaining.")
+    if not remaining:
+        return 0
+    _load_script(report["script"], script).like_comments(remaining, report=report, dry_run=report.get("dry_run", False))
+    return 0
+
+
+def cmd_report(args, script=None):
+    from comment_rules import summarize_rule_stats
+    from chrome_profile import startup_report
+
+    report = load_run_report(args.run_id)
+    if report is None:
+        print("No run report found.")
+        return 1
+
+    links = report["links"]
+    finished = "unfinished" if not report.get("finished_at") else f"{report['finished_at'] - report['started_at']:.0f}s"
+    print(f"Run {report['run_id']} ({report['script']}{', dry run' if report.get('dry_run') else ''}) | "
+          f"{len(completed_links(report))}/{len(links)} links done | {finished}")
+    for shortcode, stats in links.items():
+        ready = f"{stats['ready_s']:.2f}s" if stats.get("ready_s") is not None else "-"
+        print(f"  {shortcode:<14} likes {stats.get('likes', 0):>4} | seen {stats.get('comments_seen', '-'):>4} | "
+              f"ready {ready}{'' if stats.get('done') else ' | not done'}")
+
+    summarize_ready_times(report)
+    summarize_rule_stats(report)
+    if report.get("dry_run"):
+        summarize_scan(report)
+    startup_report()
+    return 0
+
+
+def cmd_compact(args, script=None):
+    from chrome_profile import compact_profile
+
+    compact_profile(args.profile_dir)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Like comments on Instagram posts and reels.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate = commands.add_parser("validate", help="canonicalize, dedupe and check a link list")
+    validate.add_argument("--links", default=DEFAULT_LINKS_FILE)
+    validate.set_defaults(handler=cmd_validate)
+
+    for name, handler, help_text in [
+        ("run", cmd_run, "like comments on every link"),
+        ("scan", cmd_scan, "walk comment threads without clicking and report throughput"),
+    ]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--links", default=DEFAULT_LINKS_FILE)
+        command.add_argument("--reels", action="store_true", help="links are reels (opens the comment panel)")
+        command.add_argument("--run-id", default=None)
+        command.set_defaults(handler=handler)
+
+    resume = commands.add_parser("resume", help="continue a run, skipping links it already finished")
+    resume.add_argument("--links", default=DEFAULT_LINKS_FILE)
+    resume.add_argument("--run-id", default=None, help="defaults to the most recent run")
+    resume.set_defaults(handler=cmd_resume)
+
+    report = commands.add_parser("report", help="print a run's stats")
+    report.add_argument("--run-id", default=None, help="defaults to the most recent run")
+    report.set_defaults(handler=cmd_report)
+
+    compact = commands.add_parser("compact", help="prune the golden Chrome profile down to session state "
+                                                  "(close Chrome on it first)")
+    compact.add_argument("--profile-dir", default=None, help="defaults to the bot's dedicated profile")
+    compact.set_defaults(handler=cmd_compact)
+    return parser
+
+
+def main(argv=None, script=None):
+    """
+    Parse argv and run the command. script is an already-imported liker module
+    (used when a script is run directly) and takes the place of the lazy import.
+    """
+    args = build_parser().parse_args(argv)
+    return args.handler(args, script=script)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import time
+
+
+REPLY_EXPAND_DEPTH = 2            # rounds of "View replies" expansion per pass (nested "View more replies")
+REPLY_BUDGET_PER_POST = 60        # max replies to expand on a single post
+REPLY_SETTLE_TIMEOUT_MS = 6000    # how long one round waits for all toggles to settle
+
+
+# Clicks every visible "View replies" toggle inside the container in one call and
+# resolves once all of them have settled (toggle detached or its label changed),
+# so a whole round costs a single WebDriver round trip instead of one per thread.
+EXPAND_REPLIES_JS = """
+const container = arguments[0];
+const budget = arguments[1];
+const settleMs = arguments[2];
+// A thread bigger than the whole budget is still opened if it's the post's first
+const allowOversizedFirst = arguments[3];
+const done = arguments[arguments.length - 1];
+const pattern = /view\\s+(?:all\\s+)?(?:(\\d+)\\s+)?(?:more\\s+)?repl(?:y|ies)(?:\\s*\\((\\d+)\\))?/i;
+
+const toggles = new Set();
+for (const el of container.querySelectorAll("[role='button'], button, span")) {
+    const label = (el.innerText || "").trim();
+    if (!label || label.length > 60 || !pattern.test(label)) continue;
+    toggles.add(el.closest("[role='button'], button") || el);
+}
+
+let replies = 0;
+const pending = [];
+for (const toggle of toggles) {
+    if (replies >= budget) break;
+    const label = (toggle.innerText || "").trim();
+    const match = label.match(pattern);
+    if (!match) continue;
+    const rect = toggle.getBoundingClientRect();
+    if (rect.width === 0 && rect.height === 0) continue;
+    const count = parseInt(match[1] || match[2] || "1", 10);
+    // Skip threads that would overrun the budget; smaller ones further on may still fit
+    if (replies + count > budget && !(allowOversizedFirst && !pending.length)) continue;
+    replies += count;
+    pending.push({el: toggle, label: label});
+    toggle.click();
+}
+
+if (!pending.length) {
+    done({clicked: 0, settled: 0, replies: 0});
+    return;
+}
+
+const started = Date.now();
+const timer = setInterval(() => {
+    const settled = pending.filter(p =>
+        !p.el.isConnected || (p.el.innerText || "").trim() !== p.label
+    ).length;
+    if (settled === pending.length || Date.now() - started > settleMs) {
+        clearInterval(timer);
+        done({clicked: pending.length, settled: settled, replies: replies});
+    }
+}, 100);
+"""
+
+
+def expand_reply_threads(driver, comments_container, max_depth=REPLY_EXPAND_DEPTH, reply_budget=REPLY_BUDGET_PER_POST,
+                         already_expanded=0):
+    """
+    Expand collapsed reply threads inside the comments container.
+    Each depth level triggers every visible "View replies" toggle in one in-page call
+    and waits for all of them together. Toggles whose reply count would overrun
+    reply_budget are skipped, unless nothing has been expanded on the post yet
+    (already_expanded counts earlier calls). Returns the estimated number of replies expanded.
+    """
+    expanded = 0
+    for depth in range(max_depth):
+        remaining = reply_budget - expanded
+        if remaining <= 0:
+            print(f"  Reply budget ({reply_budget}) reached")
+            break
+
+        try:
+            start = time.time()
+            result = driver.execute_async_script(
+                EXPAND_REPLIES_JS,
+                comments_container,
+                remaining,
+                REPLY_SETTLE_TIMEOUT_MS,
+                already_expanded + expanded == 0
+            )
+        except Exception as e:
+            print(f"  ✗ Reply expansion failed: {e}")
+            break
+
+        if not result or not result.get("clicked"):
+            break
+
+        expanded += result.get("replies", 0)
+        print(f"  ✓ Expanded {result['clicked']} reply thread(s) at depth {depth+1} "
+              f"({result.get('settled', 0)} settled, ~{result.get('replies', 0)} replies, {time.time() - start:.1f}s)")
+
+    return expanded
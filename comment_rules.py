@@ -0,0 +1,191 @@
+import re
+import json
+import unicodedata
+from collections import Counter
+
+
+RULES_FILE = "comment_rules.json"
+MATCHED = "matched"
+
+# Example comment_rules.json (every key is optional):
+# {
+#     "keywords_any": ["love this", "fire"],   comment must contain at least one
+#     "keywords_none": ["promo", "dm me"],     comment must contain none
+#     "usernames_allow": [],                   if non-empty, only these users
+#     "usernames_deny": ["spam_account"],
+#     "min_length": 3,
+#     "scripts": ["latin"],                    writing systems accepted (see SCRIPT_RANGES)
+#     "exclude_post_author": true
+# }
+
+# Language filtering is done by dominant writing system, which needs no extra
+# dependency and is cheap enough to run on every comment.
+SCRIPT_RANGES = {
+    "latin": [(0x0041, 0x024F), (0x1E00, 0x1EFF)],
+    "greek": [(0x0370, 0x03FF)],
+    "cyrillic": [(0x0400, 0x052F)],
+    "hebrew": [(0x0590, 0x05FF)],
+    "arabic": [(0x0600, 0x06FF), (0x0750, 0x077F)],
+    "devanagari": [(0x0900, 0x097F)],
+    "thai": [(0x0E00, 0x0E7F)],
+    "hangul": [(0x1100, 0x11FF), (0xAC00, 0xD7AF)],
+    "cjk": [(0x3040, 0x30FF), (0x4E00, 0x9FFF)],
+}
+
+POST_AUTHOR_JS = """
+const link = document.querySelector("header a[href^='/'][role='link']")
+    || Array.from(document.querySelectorAll("a[href^='/']")).find(a => a.querySelector("img[alt*='profile picture']"));
+if (!link) return null;
+const m = link.getAttribute("href").match(/^\\/([A-Za-z0-9._]+)\\/?$/);
+return m ? m[1] : null;
+"""
+
+
+def _fold(text):
+    # Same normalization for rule values and comment text, so forms NFKC unifies
+    # (full-width letters, ligatures, compatibility characters) compare equal
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+class CompiledRules:
+    """
+    A rules file compiled once: keyword lists become single trie-shaped regexes,
+    username lists become hashed sets.
+    """
+
+    def __init__(self, raw):
+        self.keywords_any = _compile_keywords(raw.get("keywords_any", []))
+        self.keywords_none = _compile_keywords(raw.get("keywords_none", []))
+        self.usernames_allow = frozenset(_fold(u).lstrip("@") for u in raw.get("usernames_allow", []))
+        self.usernames_deny = frozenset(_fold(u).lstrip("@") for u in raw.get("usernames_deny", []))
+        self.min_length = int(raw.get("min_length", 0))
+        self.scripts = frozenset(s.lower() for s in raw.get("scripts", []))
+        self.exclude_post_author = bool(raw.get("exclude_post_author", False))
+
+
+def _trie_pattern(words):
+    """
+    Regex alternation factored by common prefixes, so a large keyword list is
+    matched in one pass without trying every alternative at each position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+def _compile_keywords(words):
+    """
+    One regex for the whole list. Word boundaries are asserted only at keyword ends that
+    are word characters, so "fire" doesn't match "campfire" while "🔥" still matches "love🔥".
+    """
+    words = sorted({_fold(w).strip() for w in words if w.strip()})
+    if not words:
+        return None
+    groups = {}
+    for word in words:
+        ends = (bool(re.match(r"\w", word[0])), bool(re.match(r"\w", word[-1])))
+        groups.setdefault(ends, []).append(word)
+    branches = []
+    for (starts_word, ends_word), group in sorted(groups.items()):
+        branches.append((r"(?<!\w)" if starts_word else "") + "(?:" + _trie_pattern(group) + ")"
+                        + (r"(?!\w)" if ends_word else ""))
+    return re.compile("|".join(branches))
+
+
+def load_rules(path=RULES_FILE):
+    """
+    Compile the rules file, or return None (like everything) if there isn't one.
+    """
+    try:
+        with open(path, "r") as f:
+            rules = CompiledRules(json.load(f))
+        print(f"Loaded comment targeting rules from {path}")
+        return rules
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error loading comment rules from {path}: {e}")
+        return None
+
+
+def dominant_script(text):
+    counts = Counter()
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        code = ord(ch)
+        for script, ranges in SCRIPT_RANGES.items():
+            if any(lo <= code <= hi for lo, hi in ranges):
+                counts[script] += 1
+                break
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def read_post_author(driver):
+    try:
+        return driver.execute_script(POST_AUTHOR_JS)
+    except Exception:
+        return None
+
+
+def evaluate_batch(rules, comments, post_author=None):
+    """
+    Decide a whole view of comments at once. comments is a list of (username, text)
+    pairs; returns one reason per comment, MATCHED for those that should be liked.
+    """
+    if rules is None:
+        return [MATCHED] * len(comments)
+
+    author = _fold(post_author) if post_author else None
+    decisions = []
+    for username, text in comments:
+        user = _fold(username).lstrip("@")
+        folded = _fold(text)
+
+        if user in rules.usernames_deny:
+            decisions.append("denied_user")
+        elif rules.usernames_allow and user not in rules.usernames_allow:
+            decisions.append("not_allowed_user")
+        elif rules.exclude_post_author and author and user == author:
+            decisions.append("post_author")
+        elif len(text) < rules.min_length:
+            decisions.append("too_short")
+        elif rules.keywords_none and rules.keywords_none.search(folded):
+            decisions.append("blocked_keyword")
+        elif rules.keywords_any and not rules.keywords_any.search(folded):
+            decisions.append("no_keyword")
+        elif rules.scripts and dominant_script(text) not in rules.scripts:
+            decisions.append("wrong_script")
+        else:
+            decisions.append(MATCHED)
+    return decisions
+
+
+def summarize_rule_stats(report):
+    """
+    Print rule decisions summed over the links of a run.
+    """
+    totals = Counter()
+    for stats in report["links"].values():
+        totals.update(stats.get("rules", {}))
+    if not totals:
+        return totals
+    evaluated = sum(totals.values())
+    parts = " | ".join(f"{reason} {count}" for reason, count in totals.most_common())
+    print(f"Rules: {totals[MATCHED]}/{evaluated} comments matched ({parts})")
+    return totals
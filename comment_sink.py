@@ -0,0 +1,149 @@
+import os
+import gzip
+import json
+import time
+import queue
+import threading
+
+
+EXPORT_DIR = "exports"
+EXPORT_FORMAT = "jsonl"       # "jsonl" (gzip) or "parquet" (needs pyarrow)
+EXPORT_BATCH_SIZE = 500       # records per write / parquet row group
+EXPORT_FLUSH_INTERVAL = 5     # seconds a partial batch may wait before it's written
+EXPORT_QUEUE_SIZE = 10000     # records buffered before write() starts dropping
+EXPORT_CLOSE_TIMEOUT = 30     # seconds close() waits for the writer to drain
+
+# like button aria-label -> exported like_state
+LIKE_STATES = {"Like": "not_liked", "Unlike": "liked"}
+
+EXPORT_FIELDS = ["shortcode", "comment_id", "username", "text", "like_state", "action", "comment_ts", "observed_at"]
+
+_CLOSE = object()
+
+
+def export_path(run_id, fmt=EXPORT_FORMAT, started_at=None):
+    """
+    JSONL is appended to one file per run. A parquet file can't be appended to, so each
+    sink writes its own part (a resumed run adds a part instead of truncating the first).
+    """
+    if fmt == "parquet":
+        name = f"comments-{int(started_at if started_at is not None else time.time())}.parquet"
+    else:
+        name = "comments.jsonl.gz"
+    return os.path.join(EXPORT_DIR, f"run={run_id}", name)
+
+
+class CommentSink:
+    """
+    Streams observed comments to exports/run=<run_id>/ from a background thread.
+    write() only enqueues, so the scroll loop never waits on disk or compression.
+    """
+
+    def __init__(self, run_id, fmt=EXPORT_FORMAT, batch_size=EXPORT_BATCH_SIZE):
+        if fmt not in ("jsonl", "parquet"):
+            raise ValueError(f"Unknown export format: {fmt}")
+        if fmt == "parquet":
+            # Fail here rather than in the writer thread if pyarrow is missing
+            import pyarrow  # noqa: F401
+
+        self.path = export_path(run_id, fmt, time.time())
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="comment-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        record.setdefault("observed_at", time.time())
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Flush everything still queued and stop the writer thread. Never blocks for
+        longer than EXPORT_CLOSE_TIMEOUT, even if the writer has died or is stuck.
+        """
+        if self._thread.is_alive():
+            # One deadline shared by the handoff and the join
+            deadline = time.monotonic() + EXPORT_CLOSE_TIMEOUT
+            try:
+                self._queue.put(_CLOSE, timeout=EXPORT_CLOSE_TIMEOUT)
+                self._thread.join(max(0, deadline - time.monotonic()))
+            except queue.Full:
+                pass
+        if self._thread.is_alive():
+            print(f"Comment export did not finish within {EXPORT_CLOSE_TIMEOUT}s; {self.path} may be incomplete")
+        print(f"Exported {self.written} comments to {self.path}"
+              + (f" ({self.dropped} dropped, queue full)" if self.dropped else ""))
+
+    def _run(self):
+        writer = self._open_writer()
+        batch = []
+        closing = False
+        try:
+            while not closing:
+                try:
+                    item = self._queue.get(timeout=EXPORT_FLUSH_INTERVAL)
+                except queue.Empty:
+                    item = None
+                if item is _CLOSE:
+                    closing = True
+                elif item is not None:
+                    batch.append(item)
+                    if len(batch) < self.batch_size:
+                        continue
+                if batch:
+                    self._write_batch(writer, batch)
+                    batch = []
+        except Exception as e:
+            print(f"Comment export stopped: {e}")
+        finally:
+            writer.close()
+
+    def _open_writer(self):
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = pa.schema([
+                ("shortcode", pa.string()),
+                ("comment_id", pa.string()),
+                ("username", pa.string()),
+                ("text", pa.string()),
+                ("like_state", pa.string()),
+                ("action", pa.string()),
+                ("comment_ts", pa.float64()),
+                ("observed_at", pa.float64()),
+            ])
+            return pq.ParquetWriter(self.path, schema, compression="zstd")
+        # Appending keeps earlier members intact; gzip readers concatenate them
+        return gzip.open(self.path, "at", encoding="utf-8")
+
+    def _write_batch(self, writer, batch):
+        if self.fmt == "parquet":
+            import pyarrow as pa
+
+            columns = {field: [record.get(field) for record in batch] for field in EXPORT_FIELDS}
+            writer.write_table(pa.table(columns, schema=writer.schema))
+        else:
+            writer.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch))
+            writer.flush()
+        self.written += len(batch)
+
+
+def open_comment_sink(run_id, fmt=EXPORT_FORMAT):
+    """
+    CommentSink for the run, or None if the export can't be set up.
+    """
+    try:
+        sink = CommentSink(run_id, fmt)
+        print(f"Exporting comments to {sink.path}")
+        return sink
+    except Exception as e:
+        print(f"Comment export disabled: {e}")
+        return None
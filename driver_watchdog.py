@@ -0,0 +1,103 @@
+import os
+import signal
+import threading
+
+from chrome_profile import discard_snapshot
+
+
+SCRIPT_TIMEOUT = 30           # seconds an execute_script/execute_async_script may run
+PAGE_LOAD_TIMEOUT = 45        # seconds driver.get may block
+COMMAND_TIMEOUT = 90          # hard HTTP timeout for any single chromedriver command
+PING_INTERVAL = 60            # seconds between health pings while links are processed
+LINK_HANG_TIMEOUT = 900       # kill the browser if a single link runs longer than this
+MAX_REQUEUES = 1              # times an in-flight link is retried after a session recovery
+
+
+def configure_timeouts(driver):
+    """
+    Set script/page-load timeouts and a hard per-command timeout so a hung renderer
+    or dead chromedriver surfaces as an exception instead of blocking forever.
+    """
+    try:
+        driver.set_script_timeout(SCRIPT_TIMEOUT)
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    except Exception as e:
+        print(f"Could not set driver timeouts: {e}")
+
+    # Selenium's HTTP client to chromedriver has no timeout by default
+    client_config = getattr(getattr(driver, "command_executor", None), "_client_config", None)
+    if client_config is not None:
+        client_config.timeout = COMMAND_TIMEOUT
+
+
+def ping(driver):
+    """
+    True if the session answers a trivial script within the command timeout.
+    """
+    try:
+        return driver.execute_script("return 1;") == 1
+    except Exception:
+        return False
+
+
+def _child_pids(pid):
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children", "r") as f:
+                children.extend(int(c) for c in f.read().split())
+    except (OSError, ValueError):
+        pass
+    return children
+
+
+def _kill_process_tree(pid):
+    # chromedriver's children are the browser (detached Chrome survives chromedriver otherwise)
+    for child in _child_pids(pid):
+        _kill_process_tree(child)
+    try:
+        os.kill(pid, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+    except OSError:
+        pass
+
+
+def kill_driver(driver):
+    """
+    Hard-kill chromedriver/Chrome behind a driver without talking to it.
+    """
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None) or getattr(driver, "process", None)
+    if process is not None:
+        _kill_process_tree(process.pid)
+
+
+def arm_hang_timer(driver, timeout=LINK_HANG_TIMEOUT):
+    """
+    Start a timer that kills the browser if it isn't cancelled within timeout seconds,
+    which makes any WebDriver call blocked on it fail. Call .cancel() when the work is done.
+    """
+    def on_hang():
+        print(f"\n⚠ Watchdog: link still running after {timeout}s, killing the browser to recover")
+        kill_driver(driver)
+
+    timer = threading.Timer(timeout, on_hang)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+def recover_session(driver, launch):
+    """
+    Tear down a hung or crashed driver and return a fresh one from launch().
+    """
+    print("\n⚠ Watchdog: browser session is unresponsive, relaunching...")
+    kill_driver(driver)
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    # A killed browser may have left its cookie DB mid-write; don't copy it back
+    discard_snapshot(driver)
+    new_driver = launch()
+    print("✓ Watchdog: session recovered")
+    return new_driver
@@ -1,10 +1,10 @@
 import re
+import copy
 import time
 import pickle
-import getpass
 import random
-import requests
 import traceback
+from collections import deque
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
@@ -12,7 +12,19 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from webdriver_manager.chrome import ChromeDriverManager
+
+from links import shortcode_from_link
+from watermarks import (load_watermarks, save_watermarks, read_comment_identities, is_processed,
+                        view_below_cutoff, handled_action, advance_watermark)
+from chrome_profile import default_profile_dir, snapshot_profile, release_snapshot, record_startup_time
+from page_ready import navigate_until_ready
+from run_report import new_run_id, new_run_report, save_run_report, summarize_ready_times, summarize_scan
+from render_mode import install_animation_free_mode, scroll_into_view_instant, click_and_confirm
+from driver_watchdog import configure_timeouts, ping, arm_hang_timer, recover_session, PING_INTERVAL, MAX_REQUEUES
+from comment_rules import load_rules, read_post_author, evaluate_batch, summarize_rule_stats, MATCHED, RULES_FILE
+from comment_sink import open_comment_sink, LIKE_STATES
+from locators import find_with_fallback, find_all_with_fallback
+from comment_replies import expand_reply_threads, REPLY_EXPAND_DEPTH, REPLY_BUDGET_PER_POST
 
 
 
@@ -24,6 +36,54 @@ SKIP_PROB = 0.15                  # probability to skip the like (to appear natu
 LONG_PAUSE_PROB = 0.05            # occasional longer pause chance
 LONG_PAUSE_MIN = 5
 LONG_PAUSE_MAX = 12
+INCREMENTAL_REVISIT = True        # stop at the previous visit's high-water mark instead of walking the whole thread
+USE_PROFILE_SNAPSHOT = True       # launch Chrome from a pruned copy of the profile on tmpfs
+DRIVER_BACKEND = "selenium"       # "selenium" (through chromedriver) or "cdp" (direct DevTools WebSocket)
+PAGE_LOAD_STRATEGY = "eager"      # "normal" waits for every subresource; "eager"/"none" proceed once READY_XPATHS match
+ANIMATION_FREE = False            # disable transitions/smooth scrolling and drop the post-scroll settle sleeps
+TRACE_POSTS = False               # record a Chrome trace + performance metrics per post under traces/<run_id>/
+EXPORT_COMMENTS = False           # stream every observed comment to exports/run=<run_id>/ (see comment_sink.EXPORT_FORMAT)
+
+# Candidate locators per element role, tried in order (cached winner first).
+# Class-based entries break when Instagram ships new hashed class names; the
+# ARIA/structural entries are slower but survive layout changes.
+
+# Innermost div holding both a timestamp and a like/unlike icon, i.e. a single comment row
+COMMENT_ROW_XPATH = (
+    ".//div[.//time][.//*[name()='svg'][@aria-label='Like' or @aria-label='Unlike']]"
+    "[not(.//div[.//time][.//*[name()='svg'][@aria-label='Like' or @aria-label='Unlike']])]"
+)
+
+COMMENTS_CONTAINER_LOCATORS = [
+    ("class", By.XPATH, "//div[@class='x78zum5 xdt5ytf x1iyjqo2']"),
+    ("class-tokens", By.XPATH, "//div[contains(@class,'x78zum5') and contains(@class,'xdt5ytf') and contains(@class,'x1iyjqo2')]"
+                               "[.//*[name()='svg'][@aria-label='Like' or @aria-label='Unlike']][.//time]"),
+    # first div whose direct children each hold at most one comment timestamp, i.e. the comment list
+    ("structural", By.XPATH, "//div[count(.//time) > 1][not(./div[count(.//time) > 1])]"),
+]
+COMMENT_PROBE_LOCATORS = [
+    ("class", By.XPATH, ".//div[@class='html-div xdj266r x14z9mp xat24cr x1lziwak xexx8yu xyri2b x18d9i69 x1c1uobl x9f619 xjbqb8w " \
+     "x78zum5 x15mokao x1ga7v0g x16uus16 xbiv7yw x1uhb9sk x1plvlek xryxfnj x1iyjqo2 x2lwn1j xeuugli xdt5ytf xqjyukv x1qjc9v5 x1oa3qoh x1nhvcw1']"),
+    ("structural", By.XPATH, COMMENT_ROW_XPATH),
+]
+COMMENT_BLOCK_LOCATORS = [
+    ("class", By.XPATH, ".//div[@class='html-div xdj266r x14z9mp xat24cr x1lziwak xexx8yu xyri2b x18d9i69 x1c1uobl x9f619 xjbqb8w x78zum5" \
+     " x15mokao x1ga7v0g x16uus16 xbiv7yw x1uhb9sk x1plvlek xryxfnj x1iyjqo2 x2lwn1j xeuugli x1q0g3np xqjyukv x1qjc9v5 x1oa3qoh x1nhvcw1']"),
+    ("class-tokens", By.XPATH, ".//div[contains(@class,'html-div') and contains(@class,'x1iyjqo2') and contains(@class,'x1q0g3np')]"
+                               "[.//*[name()='svg'][@aria-label='Like' or @aria-label='Unlike']]"),
+    ("structural", By.XPATH, COMMENT_ROW_XPATH),
+]
+USERNAME_LOCATORS = [
+    ("class", By.XPATH, ".//span[@class='_ap3a _aaco _aacw _aacx _aad7 _aade']"),
+    ("structural", By.XPATH, ".//a[starts-with(@href,'/') and not(contains(@href,'/c/'))]//span[@dir='auto']"),
+]
+LIKE_BUTTON_LOCATORS = [
+    ("class", By.XPATH, ".//span[@class='xjkvuk6']//div[@role='button']"),
+    ("aria", By.XPATH, ".//div[@role='button'][.//*[name()='svg'][@aria-label='Like' or @aria-label='Unlike']]"),
+]
+
+# The post counts as ready once a comment block is rendered in the container
+READY_XPATHS = [xpath[1:] for _, by, xpath in COMMENT_PROBE_LOCATORS if by == By.XPATH]
 
 
 def human_sleep(min_s=0.4, max_s=1.4):
@@ -69,36 +129,6 @@ def human_move_and_click(driver, element):
         except Exception:
             pass
 
-def validate_url(url):
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                          "AppleWebKit/537.36 (KHTML, like Gecko) "
-                          "Chrome/117.0.0.0 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, allow_redirects=True, timeout=10)
-        # Consider valid if NOT 404/410
-        if response.status_code in [404, 410]:
-            return False
-        return True
-    except Exception:
-        return False
-
-def read_video_links(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            links = [line.strip() for line in file if line.strip()]
-            links = list(dict.fromkeys(links))  # preserve order, remove duplicates
-            print(f"Total unique links found: {len(links)}")
-        valid_links = [link for link in links if validate_url(link)]
-        if len(valid_links) < len(links):
-            print(f"Warning: {len(links) - len(valid_links)} invalid or inaccessible links skipped.")
-        print("Loaded links for processing")
-        return valid_links
-    except Exception as e:
-        print(f"Error reading video links from {file_path}: {e}")
-        return []
-
 def save_cookies(driver, path=COOKIE_FILE):
     try:
         with open(path, "wb") as f:
@@ -178,47 +208,104 @@ def wait_for_manual_login(driver, poll_interval=2, timeout=180):
         time.sleep(poll_interval)
 
 
-def get_driver_with_profile():
+def get_driver_with_profile(use_snapshot=USE_PROFILE_SNAPSHOT, backend=DRIVER_BACKEND):
+    """
+    Start Chrome on the dedicated Instagram profile. With use_snapshot, Chrome runs
+    from a tmpfs copy holding only session state; call release_snapshot() on exit.
+    backend="cdp" returns a CdpDriver that skips chromedriver entirely.
+    """
+    custom_user_data_dir = default_profile_dir() # Use a dedicated profile folder for instagram instead
+    # The snapshot copy is part of startup cost, so it's timed too
+    copy_started = time.time()
+    snapshot_dir = snapshot_profile(custom_user_data_dir) if use_snapshot else None
+    copy_s = time.time() - copy_started
+    mode = "snapshot" if snapshot_dir else "direct"
+
+    if backend == "cdp":
+        from cdp_backend import CdpDriver
+
+        start = time.time()
+        driver = CdpDriver(snapshot_dir or custom_user_data_dir, page_load_strategy=PAGE_LOAD_STRATEGY)
+        record_startup_time(f"{mode}+cdp", copy_s + time.time() - start)
+        driver.profile_snapshot_dir = snapshot_dir
+        configure_timeouts(driver)
+        if ANIMATION_FREE:
+            install_animation_free_mode(driver)
+        return driver
+
     options = Options()
-    user = getpass.getuser()
-    # custom_user_data_dir = f"C:/Users/{user}/AppData/Local/Google/Chrome/Instagram_Bot" # Use a dedicated profile folder for instagram instead
-    custom_user_data_dir = f"/Users/{user}/Library/Application Support/Google/Chrome/Instagram_Bot" # Use a dedicated profile folder for instagram instead
-    options.add_argument(f"--user-data-dir={custom_user_data_dir}")
+    options.page_load_strategy = PAGE_LOAD_STRATEGY
+    options.add_argument(f"--user-data-dir={snapshot_dir or custom_user_data_dir}")
     options.add_experimental_option("detach", True)
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
     options.add_argument("--log-level=3")
     options.add_argument("--disable-logging")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    service = Service(ChromeDriverManager().install())
+    start = time.time()
+    driver = webdriver.Chrome(service=service, options=options)
+    record_startup_time(mode, copy_s + time.time() - start)
+    driver.profile_snapshot_dir = snapshot_dir
+    configure_timeouts(driver)
+    if ANIMATION_FREE:
+        install_animation_free_mode(driver)
+    return driver
+
+
+def relaunch_driver():
+    """
+    Start a fresh browser session logged in from the saved cookies.
+    Used by the watchdog to replace a hung or crashed session.
+    """
+    driver = get_driver_with_profile()
+    load_cookies(driver)
     return driver
 
 
-def find_and_like_comments(driver, link, max_scrolls=MAX_SCROLLS):
+def find_and_like_comments(driver, link, max_scrolls=MAX_SCROLLS, watermark=None, stats=None, tracer=None, rules=None, sink=None,
+                           dry_run=False):
     """
     Finds the comments section on an Instagram post and likes comments.
     No need to click comment button - comments are already visible.
+    Per-link timings (time-to-ready) are written into the optional stats dict.
+    With a PostTracer, the whole post is traced and its summary stored in stats["trace"].
     """
+    stats = stats if stats is not None else {}
+    if tracer is not None:
+        tracer.start()
     try:
         print(f"\n{'='*60}")
         print(f"Processing: {link}")
         print(f"{'='*60}")
         
         # Navigate to the post
-        driver.get(link)
-        human_sleep(2.0, 3.5)
+        if PAGE_LOAD_STRATEGY == "normal":
+            start = time.time()
+            driver.get(link)
+            human_sleep(2.0, 3.5)
 
-        # Wait for page to be fully loaded
-        try:
-            WebDriverWait(driver, 15).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-            print("✓ Page loaded")
-        except Exception as e:
-            print(f"Page load timeout: {e}")
+            # Wait for page to be fully loaded
+            try:
+                WebDriverWait(driver, 15).until(
+                    lambda d: d.execute_script("return document.readyState") == "complete"
+                )
+                print("✓ Page loaded")
+            except Exception as e:
+                print(f"Page load timeout: {e}")
 
-        # Additional wait for dynamic content
-        human_sleep(1.5, 2.5)
+            # Additional wait for dynamic content
+            human_sleep(1.5, 2.5)
+            stats["ready_s"] = time.time() - start
+        else:
+            # Move on as soon as the comments are rendered instead of waiting out subresources
+            stats["ready_s"] = navigate_until_ready(driver, link, READY_XPATHS)
+            if stats["ready_s"] is None:
+                print("✗ Page never reached the ready state")
+            else:
+                print(f"✓ Page ready in {stats['ready_s']:.2f}s")
 
         # Check if comments section exists and is visible
         comments_container = None
@@ -227,13 +314,9 @@ def find_and_like_comments(driver, link, max_scrolls=MAX_SCROLLS):
         
         # This is the div that holds all individual comment blocks
         try:
-            comments_container = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((
-                    By.XPATH,
-                    # "//div[contains(@class,'x78zum5') and contains(@class,'xdt5ytf') and contains(@class,'x1iyjqo2')]"
-                    "//div[@class='x78zum5 xdt5ytf x1iyjqo2']"
-                ))
-            )
+            comments_container = find_with_fallback(driver, "post.comments_container", COMMENTS_CONTAINER_LOCATORS)
+            if comments_container is None:
+                raise Exception("no comments container locator matched")
             
             # Verify it's actually visible
             if not comments_container.is_displayed():
@@ -253,11 +336,7 @@ def find_and_like_comments(driver, link, max_scrolls=MAX_SCROLLS):
         try:
             # Check for at least one comment block "Individual comment paths"
 
-            test_comments = comments_container.find_elements(
-                By.XPATH,
-                ".//div[@class='html-div xdj266r x14z9mp xat24cr x1lziwak xexx8yu xyri2b x18d9i69 x1c1uobl x9f619 xjbqb8w " \
-                "x78zum5 x15mokao x1ga7v0g x16uus16 xbiv7yw x1uhb9sk x1plvlek xryxfnj x1iyjqo2 x2lwn1j xeuugli xdt5ytf xqjyukv x1qjc9v5 x1oa3qoh x1nhvcw1']"
-            )
+            test_comments = find_all_with_fallback(comments_container, "post.comment_probe", COMMENT_PROBE_LOCATORS)
             
             if len(test_comments) == 0:
                 print("✗ No comments found in container")
@@ -274,7 +353,12 @@ def find_and_like_comments(driver, link, max_scrolls=MAX_SCROLLS):
         print("Starting to scroll and like comments...")
         print("="*60 + "\n")
         # send the comment container to the function
-        likes_count = scroll_and_like_comments(driver, comments_container, test_comments, max_scrolls)
+        post_author = read_post_author(driver) if rules is not None and rules.exclude_post_author else None
+        rule_stats = stats.setdefault("rules", {}) if rules is not None else None
+        likes_count = scroll_and_like_comments(driver, comments_container, test_comments, max_scrolls, watermark=watermark,
+                                               rules=rules, post_author=post_author, rule_stats=rule_stats,
+                                               sink=sink, shortcode=shortcode_from_link(link),
+                                               dry_run=dry_run, counts=stats)
         
         return likes_count
 
@@ -283,22 +367,54 @@ def find_and_like_comments(driver, link, max_scrolls=MAX_SCROLLS):
         print(traceback.format_exc())
         return 0
 
+    finally:
+        if tracer is not None:
+            stats["trace"] = tracer.stop(shortcode_from_link(link))
+
 
-def scroll_and_like_comments(driver, comments_container, test_comments, max_scrolls=MAX_SCROLLS):
+def scroll_and_like_comments(driver, comments_container, test_comments, max_scrolls=MAX_SCROLLS,
+                             reply_depth=REPLY_EXPAND_DEPTH, reply_budget=REPLY_BUDGET_PER_POST, watermark=None,
+                             rules=None, post_author=None, rule_stats=None, sink=None, shortcode=None,
+                             dry_run=False, counts=None):
     """
     Scroll the comments section and like comments as they come into view.
+    Collapsed reply threads are expanded (up to reply_depth rounds and reply_budget
+    replies per post) so replies go through the same extraction and dedup path.
+    If a watermark dict from a previous visit is given, comments it recorded as handled
+    are skipped, and the walk stops early once a newest-first view lies entirely below
+    its cutoff. The watermark is advanced in place from the comments handled this visit.
+    Each view's comments are checked against the compiled targeting rules as one batch
+    before any click; decision counts are added to rule_stats.
+    With a CommentSink, every comment considered is exported along with what was done to it.
+    With dry_run, nothing is clicked: comments that would be liked are only counted.
+    Comment counts, the time spent (excluding post-scroll load waits) and whether the thread was walked (the loop ran
+    to completion) are written into the optional counts dict.
     """
     print("\n=== Starting comment liking process ===")
+    previous_mark = dict(watermark) if watermark else None
+    if previous_mark:
+        print(f"Revisit: {previous_mark.get('seen_count', 0)} comments processed before, "
+              f"cutoff {previous_mark.get('cutoff_ts')}, {len(previous_mark.get('processed', {}))} more recorded by ID")
+    visit_identities = []
+    handled = set()             # identities liked, already liked or skipped by rules (incl. earlier visits)
+    walked_to_end = False
+    scroll_failed = False
+    reached_watermark = False
     seen_comments = set()
+    rule_counted = set()        # unique keys already counted in rule_stats
     likes_count = 0
+    would_like = 0
+    started = time.time()
+    settle_s = 0.0              # post-scroll load waits, left out of the reported walk time
+    replies_expanded = 0
     stagnant_loops = 0
     MAX_STAGNANT_LOOPS = 5
 
     for i in range(max_scrolls):
         print(f"\n--- Scroll iteration {i+1}/{max_scrolls} ---")
 
-        # Occasional longer pause
-        if random.random() < LONG_PAUSE_PROB:
+        # Occasional longer pause (not in a scan, which measures the pipeline itself)
+        if not dry_run and random.random() < LONG_PAUSE_PROB:
             pause = random.uniform(LONG_PAUSE_MIN, LONG_PAUSE_MAX)
             print(f"Taking a longer pause for {pause:.1f}s")
             time.sleep(pause)
@@ -323,20 +439,30 @@ def scroll_and_like_comments(driver, comments_container, test_comments, max_scro
             
             if not scrolled:
                 print("Unable to scroll; breaking out")
+                scroll_failed = True
                 break
 
+            # Newly scrolled comments need a moment to load; timed so it can be left out
+            settle_started = time.time()
             human_sleep(0.8, 1.5)
+            settle_s += time.time() - settle_started
 
         print(f"Found {len(test_comments)} comment blocks in view")
 
-        # Find all comment blocks in the current view
+        # Expand any reply threads that came into view in one batched call
+        if reply_depth > 0 and replies_expanded < reply_budget:
+            replies_expanded += expand_reply_threads(
+                driver,
+                comments_container,
+                max_depth=reply_depth,
+                reply_budget=reply_budget - replies_expanded,
+                already_expanded=replies_expanded
+            )
+
+        # Find all comment blocks in the current view (reply blocks share the same markup)
         try:
             # Finds each individual comment and like section, which will be used to with individual comments and likes
-            comment_and_like_blocks = comments_container.find_elements(
-                By.XPATH,
-                ".//div[@class='html-div xdj266r x14z9mp xat24cr x1lziwak xexx8yu xyri2b x18d9i69 x1c1uobl x9f619 xjbqb8w x78zum5" \
-                " x15mokao x1ga7v0g x16uus16 xbiv7yw x1uhb9sk x1plvlek xryxfnj x1iyjqo2 x2lwn1j xeuugli x1q0g3np xqjyukv x1qjc9v5 x1oa3qoh x1nhvcw1']"
-            )
+            comment_and_like_blocks = find_all_with_fallback(comments_container, "post.comment_block", COMMENT_BLOCK_LOCATORS)
 
             # comment_blocks = comment_and_like_blocks.find_elements(
             #     By.XPATH,
@@ -360,18 +486,32 @@ def scroll_and_like_comments(driver, comments_container, test_comments, max_scro
                 break
             continue
 
-        before_count = len(seen_comments)
+        # Comments skipped as processed still count as progress down the thread
+        before_count = len(seen_comments) + len(handled)
+
+        # Read comment IDs/timestamps for the whole view in one call
+        identities = read_comment_identities(driver, comment_and_like_blocks)
+        visit_identities.extend(identity for identity in identities if identity != (None, None))
+        if view_below_cutoff(identities, previous_mark):
+            print(f"\n Reached comments below the previous visit's cutoff ({len(identities)} in view). Stopping.")
+            reached_watermark = True
+            walked_to_end = True
+            break
   
+        # First pass: extract username/text for every new comment in view
+        candidates = []
+        view_keys = set()
         for idx, comment_block in enumerate(comment_and_like_blocks):
+            if is_processed(identities[idx], previous_mark):
+                handled.add(identities[idx])
+                continue
             try:
                 # Extract username
                 username = ""
                 try:
-                    username_elem = comment_block.find_element(
-                        By.XPATH,
-                        ".//span[@class='_ap3a _aaco _aacw _aacx _aad7 _aade']"
-                    )
-                    username = username_elem.text.strip()
+                    username_elem = find_with_fallback(driver, "post.username", USERNAME_LOCATORS, root=comment_block, timeout=0)
+                    if username_elem is not None:
+                        username = username_elem.text.strip()
                 except:
                     pass
 
@@ -395,13 +535,37 @@ def scroll_and_like_comments(driver, comments_container, test_comments, max_scro
                 # Create unique identifier
                 unique_key = f"{username}:{comment_text[:100]}" if username else comment_text[:100]
                 
-                if not unique_key or unique_key in seen_comments:
+                if not unique_key or unique_key in seen_comments or unique_key in view_keys:
                     continue
-                
+                view_keys.add(unique_key)
+                candidates.append((comment_block, username, comment_text, unique_key, identities[idx]))
+
+            except Exception as e:
+                print(f"Error processing comment: {e}")
+                continue
+
+        # Decide the whole view against the targeting rules before any click
+        decisions = evaluate_batch(rules, [(c[1], c[2]) for c in candidates], post_author)
+        if rule_stats is not None:
+            # Comments left unhandled come round again in later views; count each once per post
+            for candidate, decision in zip(candidates, decisions):
+                if candidate[3] not in rule_counted:
+                    rule_counted.add(candidate[3])
+                    rule_stats[decision] = rule_stats.get(decision, 0) + 1
+
+        for (comment_block, username, comment_text, unique_key, identity), decision in zip(candidates, decisions):
+            action, like_state = "seen", None
+            try:
                 # Display info about current comment
                 display_text = comment_text[:50] + "..." if len(comment_text) > 50 else comment_text
                 print(f"\n[{len(seen_comments)}] @{username}: {display_text}")
 
+                if decision != MATCHED:
+                    print(f"  ⊘ Skipped by rules ({decision})")
+                    action = f"rule_{decision}"
+                    seen_comments.add(unique_key)
+                    continue
+
                 # Random skip for human-like behavior
                 # if random.random() < SKIP_PROB:
                 #     print(" → Skipping (random)")
@@ -411,11 +575,15 @@ def scroll_and_like_comments(driver, comments_container, test_comments, max_scro
 
                  # Scroll comment into view
                 try:
-                    driver.execute_script(
-                        "arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});",
-                        comment_block
-                    )
-                    human_sleep(0.8, 1.5)
+                    if ANIMATION_FREE or dry_run:
+                        # Instant scroll lands in the same tick, nothing to wait out
+                        scroll_into_view_instant(driver, comment_block)
+                    else:
+                        driver.execute_script(
+                            "arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});",
+                            comment_block
+                        )
+                        human_sleep(0.8, 1.5)
                 except:
                     pass
 
@@ -424,14 +592,12 @@ def scroll_and_like_comments(driver, comments_container, test_comments, max_scro
 
                 try:
                     # First, find the container that has the like button
-                    human_sleep(0.3, 0.8)
-                    like_block = comment_block.find_element(
-                        By.XPATH,
-                        ".//span[@class='xjkvuk6']"
-                    )
+                    if not ANIMATION_FREE and not dry_run:
+                        human_sleep(0.3, 0.8)
+                    button = find_with_fallback(driver, "post.like_button", LIKE_BUTTON_LOCATORS, root=comment_block, timeout=0)
+                    if button is None:
+                        raise Exception("no like button locator matched")
 
-                    button= like_block.find_element(By.XPATH, ".//div[@role='button']")
-    
                     if button.is_displayed():
                         try:
                             # Find SVG using tag name (more reliable)
@@ -442,8 +608,32 @@ def scroll_and_like_comments(driver, comments_container, test_comments, max_scro
                                 aria_label = svg.get_attribute("aria-label")
                                 
                                 print(f"  ℹ Button found with SVG aria-label: '{aria_label}'")
+                                like_state = LIKE_STATES.get(aria_label)
                                 
-                                if aria_label == "Like":
+                                if dry_run:
+                                    # Scan only: record what would happen, never click
+                                    if aria_label == "Like":
+                                        would_like += 1
+                                        action = "would_like"
+                                    elif aria_label == "Unlike":
+                                        action = "already_liked"
+                                    seen_comments.add(unique_key)
+
+                                elif aria_label == "Like" and ANIMATION_FREE:
+                                    # Click and read the new state back in one call
+                                    print(f"  ✓ Clicking 'Like' button...")
+                                    confirmed_label = click_and_confirm(driver, button)
+                                    if confirmed_label == "Unlike":
+                                        print(f"  ✓ Liked comment")
+                                        likes_count += 1
+                                        action, like_state = "liked", "liked"
+                                        seen_comments.add(unique_key)
+                                        human_sleep(0.5, 1)
+                                    else:
+                                        print(f"  ✗ Like not confirmed (aria-label '{confirmed_label}')")
+                                        action = "like_failed"
+
+                                elif aria_label == "Like":
                                     print(f"  ✓ Clicking 'Like' button...")
                                     driver.execute_script("arguments[0].scrollIntoView(true);", button)
                                     human_sleep(0.2, 0.4)
@@ -468,15 +658,18 @@ def scroll_and_like_comments(driver, comments_container, test_comments, max_scro
                                             
                                     print(f"  ✓ Liked comment")
                                     likes_count += 1
+                                    action, like_state = "liked", "liked"
                                     seen_comments.add(unique_key)
                                     human_sleep(0.5, 1)
                                     
                                 elif aria_label == "Unlike":
                                     print(f"  ⊘ Already liked - skipping")
+                                    action = "already_liked"
                                     seen_comments.add(unique_key)
                                     # break
                                 else:
                                     print(f"  ? Unknown aria-label '{aria_label}' - skipping")
+                                    action = "unknown_state"
                                     # break
                                     
                         except Exception as svg_error:
@@ -484,29 +677,47 @@ def scroll_and_like_comments(driver, comments_container, test_comments, max_scro
                     
                 except Exception as e:
                     print(f"  ✗ Error clicking like: {e}")
-                    human_sleep(0.3, 0.8)
+                    action = "error"
+                    if not dry_run:
+                        human_sleep(0.3, 0.8)
 
             except Exception as e:
                 print(f"Error processing comment: {e}")
+                action = "error"
                 continue
+            finally:
+                if handled_action(action) and identity != (None, None):
+                    handled.add(identity)
+                if sink is not None:
+                    sink.write({
+                        "shortcode": shortcode,
+                        "comment_id": identity[0],
+                        "username": username,
+                        "text": comment_text,
+                        "like_state": like_state,
+                        "action": action,
+                        "comment_ts": identity[1],
+                    })
 
         # Check for stagnation (no new comments)
-        if len(seen_comments) == before_count:
+        if len(seen_comments) + len(handled) == before_count:
             stagnant_loops += 1
             print(f"\n No new comments loaded. Stagnant: {stagnant_loops}/{MAX_STAGNANT_LOOPS}")
 
             if stagnant_loops == 2:
                 print(" Task completed - no new comments found after two (2) scrolls.")
+                walked_to_end = True
                 break
             
             if stagnant_loops >= MAX_STAGNANT_LOOPS:
                 print(f"Reached end of comments {MAX_STAGNANT_LOOPS} times. Stopping.")
+                walked_to_end = True
                 break
         else:
             stagnant_loops = 0
 
         # Occasional scroll up (human behavior)
-        if random.random() < 0.08:
+        if not dry_run and random.random() < 0.08:
             try:
                 driver.execute_script(
                     "arguments[0].scrollTop -= arguments[1];",
@@ -521,14 +732,34 @@ def scroll_and_like_comments(driver, comments_container, test_comments, max_scro
         if i % 10 == 0 and i > 0:
             print(f"\n📊 Progress: {likes_count} likes | {len(seen_comments)} comments seen")
 
+    if watermark is not None:
+        advance_watermark(watermark, visit_identities, handled, walked_to_end, len(seen_comments))
+
+    elapsed = time.time() - started - settle_s
+    if counts is not None:
+        counts["comments_seen"] = len(seen_comments)
+        counts["would_like"] = would_like
+        counts["scroll_s"] = round(elapsed, 3)
+        counts["settle_s"] = round(settle_s, 3)
+        counts["walked"] = not scroll_failed
+
     print(f"\n{'='*60}")
-    print(f"✓ Finished: {likes_count} likes | {len(seen_comments)} comments processed")
+    if dry_run:
+        print(f"✓ Scanned: {len(seen_comments)} comments | {would_like} would be liked | "
+              f"{len(seen_comments) / elapsed if elapsed else 0:.1f} comments/s")
+    else:
+        print(f"✓ Finished: {likes_count} likes | {len(seen_comments)} comments processed"
+              + (" | stopped at watermark" if reached_watermark else ""))
     print(f"{'='*60}\n")
     
     return likes_count
 
 
-def like_comments(video_links):
+def like_comments(video_links, run_id=None, report=None, dry_run=False):
+    """
+    Like comments on every link, recording per-link stats in a run report under runs/.
+    Pass a previous run's report to continue it, or dry_run=True to scan without liking.
+    """
     try:
         driver = get_driver_with_profile()
         print("Connected to Chrome with persistent profile.")
@@ -554,45 +785,117 @@ def like_comments(video_links):
 
     time.sleep(3)
     processed_links = 0
+    report = report or new_run_report(run_id or new_run_id(), "post")
+    report["dry_run"] = dry_run
+    results = report["links"]  # shortcode -> per-link stats
+    # A scan neither relies on nor advances the watermarks
+    incremental = INCREMENTAL_REVISIT and not dry_run
+    watermarks = load_watermarks() if incremental else {}
+
+    rules = load_rules(RULES_FILE)
+    sink = open_comment_sink(report["run_id"]) if EXPORT_COMMENTS else None
+    tracer = None
+    if TRACE_POSTS:
+        from post_tracing import open_post_tracer
+        tracer = open_post_tracer(driver, report["run_id"])
+
+    pending = deque(video_links)
+    requeued = {}  # shortcode -> times retried after a session recovery
+    last_ping = time.time()
 
     try:
-        for link in video_links:
+        while pending:
+            link = pending.popleft()
+            shortcode = shortcode_from_link(link)
+            comments_section = 0
+            walked = False
+            # Deep copy: the nested processed-ID dict is mutated in place during the visit
+            watermark_before = copy.deepcopy(watermarks.get(shortcode, {}))
             try:
-                # print(f"Processing link: {link}")
-                
-                # Find the comment container and like comments
-                comments_section = find_and_like_comments(driver, link, max_scrolls=MAX_SCROLLS)
-                if not comments_section:
-                    print(f"Skipping {link}: couldn't open comments after retries.")
-                    continue
-
-                print("Comments panel opened. Starting scroll-and-like routine...")
-                # liked = scroll_and_like_comments(driver, comments_section, max_scrolls=MAX_SCROLLS)
-                # print(f"Done with this post: liked {liked} comments on {link}")
-                processed_links += 1
+                # Periodic health ping so a dead session is replaced before the next link
+                if time.time() - last_ping > PING_INTERVAL:
+                    last_ping = time.time()
+                    if not ping(driver):
+                        driver = recover_session(driver, relaunch_driver)
+                        if tracer is not None:
+                            tracer.close()
+                            tracer = open_post_tracer(driver, report["run_id"])
 
-                # small delay between posts
-                human_sleep(2.0, 4.0)
+                # Find the comment container and like comments
+                watermark = watermarks.setdefault(shortcode, {}) if incremental else None
+                stats = results[shortcode] = {"link": link}
+                hang_timer = arm_hang_timer(driver)
+                try:
+                    comments_section = find_and_like_comments(driver, link, max_scrolls=MAX_SCROLLS, watermark=watermark,
+                                                              stats=stats, tracer=tracer, rules=rules, sink=sink,
+                                                              dry_run=dry_run)
+                finally:
+                    hang_timer.cancel()
+                stats["likes"] = comments_section
+                # A walked thread is the success signal, whether or not anything was liked
+                walked = stats.get("walked", False)
+                save_run_report(report)
+                if incremental:
+                    save_watermarks(watermarks)
 
             except Exception as e:
                 print(f"Unexpected error while processing {link}: {e}")
                 print(traceback.format_exc())
-                human_sleep(2.0, 4.0)
+
+            if not walked and not ping(driver):
+                # The session hung or crashed mid-link: relaunch and retry the link
+                driver = recover_session(driver, relaunch_driver)
+                last_ping = time.time()
+                if tracer is not None:
+                    tracer.close()
+                    tracer = open_post_tracer(driver, report["run_id"])
+                if incremental:
+                    # Comments read before the crash weren't necessarily processed
+                    watermarks[shortcode] = watermark_before
+                    save_watermarks(watermarks)
+                if requeued.get(shortcode, 0) < MAX_REQUEUES:
+                    requeued[shortcode] = requeued.get(shortcode, 0) + 1
+                    print(f"Requeued {link} after session recovery.")
+                    pending.appendleft(link)
+                    continue
+
+            if not walked:
+                print(f"Skipping {link}: couldn't open comments after retries.")
                 continue
 
+            print("Comments panel opened. Starting scroll-and-like routine...")
+            # liked = scroll_and_like_comments(driver, comments_section, max_scrolls=MAX_SCROLLS)
+            # print(f"Done with this post: liked {liked} comments on {link}")
+            processed_links += 1
+            results[shortcode]["done"] = True
+            save_run_report(report)
+
+            # small delay between posts
+            human_sleep(2.0, 4.0)
+
         print(f"\nCompleted processing {processed_links} out of {len(video_links)} links.")
+        report["finished_at"] = time.time()
+        save_run_report(report)
+        summarize_ready_times(report)
+        summarize_rule_stats(report)
+        if dry_run:
+            summarize_scan(report)
+        return results
     finally:
+        if tracer is not None:
+            tracer.close()
+        if sink is not None:
+            sink.close()
         try:
-            pass
+            # Snapshot runs quit the browser and persist cookies; direct runs stay detached
+            release_snapshot(driver)
             # driver.quit()
         except Exception:
             pass
 
 if __name__ == "__main__":
-    video_links_file = "video_links.txt"
-    video_links = read_video_links(video_links_file)
-    if video_links:
-        like_comments(video_links)
+    import sys
+    from cli import main
 
-    else:
-        print("No valid links provided. Please add links to video_links.txt or check your internet connection.")
+    # Same as `python cli.py run`; extra arguments are passed through
+    sys.exit(main(["run"] + sys.argv[1:], script=sys.modules[__name__]))
@@ -0,0 +1,191 @@
+import re
+import json
+import time
+from urllib.parse import urlsplit
+
+
+VALIDATION_CACHE_FILE = "link_validation_cache.json"
+VALIDATION_CACHE_TTL = 24 * 3600    # seconds a cached validation result stays fresh
+
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/117.0.0.0 Safari/537.36"
+}
+
+INSTAGRAM_HOSTS = {"instagram.com", "www.instagram.com", "m.instagram.com", "instagr.am", "www.instagr.am"}
+
+# First path segments that are Instagram routes, not usernames. /share/reel/<token> in
+# particular carries a share token, not a shortcode, and has to be resolved by redirect.
+RESERVED_SEGMENTS = ["share", "stories", "explore", "accounts", "direct", "about", "legal", "developer"]
+
+# /p/<code>, /reel/<code>, /reels/<code>, /tv/<code>, optionally behind a /<username>/ prefix
+SHORTCODE_PATTERN = re.compile(
+    r"^/(?:(?!(?:" + "|".join(RESERVED_SEGMENTS) + r")/)[A-Za-z0-9._]+/)?(p|reel|reels|tv)/([A-Za-z0-9_-]+)/?"
+)
+SHARE_PATTERN = re.compile(r"^/share/(?:(?:p|reel|reels|tv)/)?[A-Za-z0-9_-]+/?")
+
+# Path kinds that point at the same media; reels and posts share one shortcode space
+KIND_ALIASES = {"reels": "reel", "tv": "p"}
+
+
+def parse_shortcode(url):
+    """
+    Return (kind, shortcode) for an Instagram post/reel URL, or (None, None).
+    Scheme, host casing, query string, fragment and trailing slash are ignored.
+    """
+    url = url.strip()
+    if not url:
+        return None, None
+    if "://" not in url:
+        url = "https://" + url
+
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None, None
+
+    if (parts.hostname or "").lower() not in INSTAGRAM_HOSTS:
+        return None, None
+
+    match = SHORTCODE_PATTERN.match(parts.path)
+    if not match:
+        return None, None
+
+    kind = KIND_ALIASES.get(match.group(1), match.group(1))
+    return kind, match.group(2)
+
+
+def canonicalize_link(url):
+    """
+    Return (shortcode, canonical_url) for a link, or (None, None) if it isn't a post/reel.
+    The canonical form is https://www.instagram.com/<kind>/<shortcode>/ with tracking params dropped.
+    """
+    kind, shortcode = parse_shortcode(url)
+    if not shortcode:
+        return None, None
+    return shortcode, f"https://www.instagram.com/{kind}/{shortcode}/"
+
+
+def is_share_link(url):
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False
+    return (parts.hostname or "").lower() in INSTAGRAM_HOSTS and bool(SHARE_PATTERN.match(parts.path))
+
+
+def resolve_share_link(url):
+    """
+    Follow a /share/ link's redirect to the media it points at.
+    Returns the final URL, or None if it can't be resolved to a post/reel.
+    """
+    try:
+        import requests
+
+        if "://" not in url:
+            url = "https://" + url
+        response = requests.get(url.strip(), headers=REQUEST_HEADERS, allow_redirects=True, timeout=10)
+    except Exception:
+        return None
+    _, shortcode = parse_shortcode(response.url)
+    return response.url if shortcode else None
+
+
+def shortcode_from_link(url):
+    """
+    Shortcode used as the key for dedup, validation caching and results.
+    Falls back to the stripped URL for links that can't be parsed.
+    """
+    shortcode, _ = canonicalize_link(url)
+    return shortcode or url.strip()
+
+
+def load_validation_cache(path=VALIDATION_CACHE_FILE):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Error loading validation cache: {e}")
+        return {}
+
+
+def save_validation_cache(cache, path=VALIDATION_CACHE_FILE):
+    try:
+        with open(path, "w") as f:
+            json.dump(cache, f, indent=2)
+    except Exception as e:
+        print(f"Error saving validation cache: {e}")
+
+
+def validate_url(url, cache=None):
+    """
+    Check that a link doesn't 404/410. Results are cached per shortcode, so the
+    post and reel forms of the same media are only requested once.
+    """
+    key = shortcode_from_link(url)
+    if cache is not None:
+        entry = cache.get(key)
+        if entry and time.time() - entry.get("checked_at", 0) < VALIDATION_CACHE_TTL:
+            return entry["valid"]
+
+    try:
+        import requests
+
+        response = requests.get(url, headers=REQUEST_HEADERS, allow_redirects=True, timeout=10)
+        # Consider valid if NOT 404/410
+        valid = response.status_code not in [404, 410]
+    except Exception:
+        # Network errors aren't cached so the link is retried next time
+        return False
+
+    if cache is not None:
+        cache[key] = {"valid": valid, "checked_at": time.time()}
+    return valid
+
+
+def read_video_links(file_path):
+    """
+    Read links from file_path, canonicalize them and drop duplicates by shortcode.
+    Returns the canonical URLs that passed validation, in file order.
+    """
+    try:
+        with open(file_path, 'r') as file:
+            raw_links = [line.strip() for line in file if line.strip()]
+
+        links = {}
+        unparsed = 0
+        for raw in raw_links:
+            if is_share_link(raw):
+                resolved = resolve_share_link(raw)
+                if resolved is None:
+                    print(f"Warning: could not resolve share link {raw}")
+                    unparsed += 1
+                    continue
+                raw = resolved
+            shortcode, canonical = canonicalize_link(raw)
+            if not shortcode:
+                unparsed += 1
+                continue
+            links.setdefault(shortcode, canonical)  # preserve order, first form wins
+
+        print(f"Total unique links found: {len(links)} ({len(raw_links) - len(links) - unparsed} duplicates merged)")
+        if unparsed:
+            print(f"Warning: {unparsed} lines are not Instagram post/reel links and were skipped.")
+
+        cache = load_validation_cache()
+        valid_links = [link for link in links.values() if validate_url(link, cache)]
+        save_validation_cache(cache)
+
+        if len(valid_links) < len(links):
+            print(f"Warning: {len(links) - len(valid_links)} invalid or inaccessible links skipped.")
+        print("Loaded links for processing")
+        return valid_links
+    except Exception as e:
+        print(f"Error reading video links from {file_path}: {e}")
+        return []
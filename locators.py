@@ -0,0 +1,89 @@
+import json
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+LOCATOR_CACHE_FILE = "locator_cache.json"
+PRIMARY_TIMEOUT = 5          # seconds to wait for the first (cached winner) candidate
+FALLBACK_TIMEOUT = 1.5       # seconds to wait for each remaining candidate
+
+_winners = None              # role -> name of the candidate that last matched
+_reported = set()            # roles whose fallback was already logged this run
+
+
+def load_locator_cache(path=None):
+    global _winners
+    if _winners is None:
+        try:
+            with open(path or LOCATOR_CACHE_FILE, "r") as f:
+                _winners = json.load(f)
+        except FileNotFoundError:
+            _winners = {}
+        except Exception as e:
+            print(f"Error loading locator cache: {e}")
+            _winners = {}
+    return _winners
+
+
+def save_locator_cache(path=None):
+    try:
+        with open(path or LOCATOR_CACHE_FILE, "w") as f:
+            json.dump(load_locator_cache(), f, indent=2)
+    except Exception as e:
+        print(f"Error saving locator cache: {e}")
+
+
+def ordered_candidates(role, candidates):
+    """
+    Candidates are (name, by, value) tuples in preference order.
+    The cached winner for the role, if any, is moved to the front.
+    """
+    winner = load_locator_cache().get(role)
+    return sorted(candidates, key=lambda c: c[0] != winner)
+
+
+def _record_winner(role, name, candidates):
+    winners = load_locator_cache()
+    if name != candidates[0][0] and role not in _reported:
+        print(f"  ⚠ Locator fallback for '{role}': '{name}' matched (primary '{candidates[0][0]}' missed)")
+        _reported.add(role)
+    if winners.get(role) != name:
+        winners[role] = name
+        save_locator_cache()
+
+
+def find_with_fallback(driver, role, candidates, root=None, timeout=PRIMARY_TIMEOUT):
+    """
+    Return the first element matched by the role's candidates, or None.
+    Searches inside root if given, otherwise the whole page. The first candidate tried
+    gets `timeout` seconds, the rest FALLBACK_TIMEOUT; a timeout of 0 probes without waiting.
+    """
+    scope = root if root is not None else driver
+    for attempt, (name, by, value) in enumerate(ordered_candidates(role, candidates)):
+        wait = timeout if attempt == 0 else min(timeout, FALLBACK_TIMEOUT)
+        try:
+            if wait > 0:
+                element = WebDriverWait(scope, wait).until(lambda s: s.find_element(by, value))
+            else:
+                element = scope.find_element(by, value)
+        except Exception:
+            continue
+        _record_winner(role, name, candidates)
+        return element
+    return None
+
+
+def find_all_with_fallback(root, role, candidates):
+    """
+    Return the elements matched by the first candidate that finds any, or [].
+    Never waits; used for repeated lookups inside an already-loaded container.
+    """
+    for name, by, value in ordered_candidates(role, candidates):
+        try:
+            elements = root.find_elements(by, value)
+        except Exception:
+            continue
+        if elements:
+            _record_winner(role, name, candidates)
+            return elements
+    return []
@@ -0,0 +1,63 @@
+import time
+
+
+READY_TIMEOUT = 15            # seconds to wait for the page's ready condition
+
+# Resolves with the ms it took for any XPath to match min_count nodes, or -1 on timeout.
+# Re-checks on DOM mutations (throttled) instead of polling from Python, so the call
+# returns the moment the condition holds.
+WAIT_FOR_READY_JS = """
+const xpaths = arguments[0];
+const minCount = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+
+const ready = () => xpaths.some(xp =>
+    document.evaluate(xp, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength >= minCount
+);
+if (ready()) { done(0); return; }
+
+let scheduled = false;
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (scheduled) return;
+    scheduled = true;
+    setTimeout(() => {
+        scheduled = false;
+        if (ready()) finish(true);
+    }, 50);
+});
+function finish(ok) {
+    observer.disconnect();
+    clearTimeout(timer);
+    done(ok ? performance.now() - started : -1);
+}
+observer.observe(document.documentElement || document, {childList: true, subtree: true});
+timer = setTimeout(() => finish(ready()), timeoutMs);
+"""
+
+
+def wait_until_ready(driver, xpaths, min_count=1, timeout=READY_TIMEOUT):
+    """
+    Block until any of the XPaths matches at least min_count nodes.
+    Returns True when ready, False on timeout or error.
+    """
+    try:
+        waited_ms = driver.execute_async_script(WAIT_FOR_READY_JS, xpaths, min_count, int(timeout * 1000))
+        return waited_ms is not None and waited_ms >= 0
+    except Exception as e:
+        print(f"Ready check failed: {e}")
+        return False
+
+
+def navigate_until_ready(driver, link, xpaths, min_count=1, timeout=READY_TIMEOUT):
+    """
+    Navigate to link and wait for the ready condition.
+    Returns seconds from navigation start to ready, or None if it never became ready.
+    """
+    start = time.time()
+    driver.get(link)
+    if wait_until_ready(driver, xpaths, min_count, timeout):
+        return time.time() - start
+    return None
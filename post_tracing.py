@@ -0,0 +1,163 @@
+import os
+import gzip
+import json
+import time
+import base64
+
+import trio
+
+from cdp_backend import TrioLoopThread, page_websocket_url
+
+
+TRACE_DIR = "traces"
+TRACE_END_TIMEOUT = 60        # seconds to wait for Chrome to flush a trace
+TRACE_CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "v8.execute",
+    "blink.user_timing",
+    "loading",
+]
+
+# Performance.getMetrics counters diffed around each post
+METRIC_NAMES = {
+    "LayoutCount": "layout_count",
+    "RecalcStyleCount": "recalc_style_count",
+    "LayoutDuration": "layout_s",
+    "RecalcStyleDuration": "recalc_style_s",
+    "ScriptDuration": "script_s",
+    "TaskDuration": "task_s",
+}
+
+
+def debugger_address(driver):
+    """
+    host:port of the browser's DevTools endpoint for either backend.
+    """
+    address = getattr(driver, "debugger_address", None)
+    if address:
+        return address
+    return driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+
+
+class PostTracer:
+    """
+    Records a Chrome trace plus Performance metrics around each post over a second
+    DevTools connection to the page, next to whichever backend drives it.
+    """
+
+    def __init__(self, driver, run_id):
+        self.trace_dir = os.path.join(TRACE_DIR, run_id)
+        os.makedirs(self.trace_dir, exist_ok=True)
+        self._loop = TrioLoopThread()
+        self.session = self._loop.open_session(page_websocket_url(debugger_address(driver)))
+        self._loop.run(self.session.send, "Performance.enable")
+        self._metrics_before = None
+        self._started_at = None
+
+    async def _metrics(self):
+        result = await self.session.send("Performance.getMetrics")
+        return {m["name"]: m["value"] for m in result.get("metrics", [])}
+
+    async def _end_trace(self):
+        subscription = self.session.listen("Tracing.tracingComplete")
+        try:
+            await self.session.send("Tracing.end")
+            with trio.fail_after(TRACE_END_TIMEOUT):
+                params = await subscription.receive()
+        finally:
+            self.session.unlisten(subscription)
+        return params.get("stream")
+
+    async def _read_stream(self, handle):
+        chunks = []
+        while True:
+            result = await self.session.send("IO.read", {"handle": handle, "size": 1 << 20})
+            data = result.get("data", "")
+            chunks.append(base64.b64decode(data) if result.get("base64Encoded") else data.encode())
+            if result.get("eof"):
+                break
+        await self.session.send("IO.close", {"handle": handle})
+        return b"".join(chunks)
+
+    def start(self):
+        try:
+            self._metrics_before = self._loop.run(self._metrics)
+            self._loop.run(self.session.send, "Tracing.start", {
+                "transferMode": "ReturnAsStream",
+                "streamCompression": "gzip",
+                "traceConfig": {"includedCategories": TRACE_CATEGORIES, "recordMode": "recordUntilFull"},
+            })
+            self._started_at = time.time()
+        except Exception as e:
+            print(f"Could not start trace: {e}")
+            self._started_at = None
+
+    def stop(self, shortcode):
+        """
+        End the trace, save it as <shortcode>.json.gz and return the summary dict.
+        """
+        if self._started_at is None:
+            return None
+        try:
+            wall_s = time.time() - self._started_at
+            metrics_after = self._loop.run(self._metrics)
+            data = self._loop.run(self._read_stream, self._loop.run(self._end_trace))
+            if not data.startswith(b"\x1f\x8b"):
+                data = gzip.compress(data)
+
+            path = os.path.join(self.trace_dir, f"{shortcode}.json.gz")
+            with open(path, "wb") as f:
+                f.write(data)
+
+            summary = summarize_trace(data, self._metrics_before, metrics_after)
+            summary["shortcode"] = shortcode
+            summary["wall_s"] = round(wall_s, 3)
+            # Time not spent on browser main-thread tasks: Python, WebDriver hops, sleeps
+            summary["outside_browser_s"] = round(wall_s - summary.get("task_s", 0), 3)
+            with open(os.path.join(self.trace_dir, "summary.jsonl"), "a") as f:
+                f.write(json.dumps(summary) + "\n")
+
+            print(f"  Trace: {summary['layout_count']} layouts | script {summary['script_s']:.2f}s | "
+                  f"recalc style {summary['recalc_style_s']:.2f}s | {summary['network_bytes'] / 1e6:.1f} MB | "
+                  f"browser tasks {summary['task_s']:.2f}s of {wall_s:.1f}s -> {path}")
+            return summary
+        except Exception as e:
+            print(f"Could not save trace: {e}")
+            return None
+        finally:
+            self._started_at = None
+
+    def close(self):
+        self._loop.stop()
+
+
+def summarize_trace(data, metrics_before, metrics_after):
+    """
+    Layout/style/script costs from the metric deltas plus network bytes from the trace.
+    """
+    summary = {}
+    for name, key in METRIC_NAMES.items():
+        delta = metrics_after.get(name, 0) - metrics_before.get(name, 0)
+        summary[key] = int(delta) if key.endswith("_count") else round(delta, 4)
+
+    trace = json.loads(gzip.decompress(data))
+    events = trace.get("traceEvents", []) if isinstance(trace, dict) else trace
+    network_bytes = 0
+    for event in events:
+        if event.get("name") == "ResourceFinish":
+            network_bytes += event.get("args", {}).get("data", {}).get("encodedDataLength", 0)
+    summary["network_bytes"] = network_bytes
+    summary["trace_events"] = len(events)
+    return summary
+
+
+def open_post_tracer(driver, run_id):
+    """
+    PostTracer for the driver, or None if DevTools isn't reachable.
+    """
+    try:
+        return PostTracer(driver, run_id)
+    except Exception as e:
+        print(f"Tracing disabled: {e}")
+        return None
@@ -0,0 +1,80 @@
+LIKE_CONFIRM_TIMEOUT_MS = 1500    # how long click_and_confirm waits for the icon to flip
+
+# Injected before any page script runs: kills CSS transitions/animations and smooth
+# scrolling, and forces scrollIntoView to jump instantly even when a page (or we)
+# ask for behavior: 'smooth'.
+ANIMATION_FREE_JS = """
+(() => {
+    const css = "*, *::before, *::after { transition: none !important; animation: none !important; scroll-behavior: auto !important; }";
+    const install = () => {
+        if (document.getElementById("instagram-bot-no-animations")) return;
+        const style = document.createElement("style");
+        style.id = "instagram-bot-no-animations";
+        style.textContent = css;
+        (document.head || document.documentElement).appendChild(style);
+    };
+    if (document.documentElement) install();
+    document.addEventListener("DOMContentLoaded", install);
+
+    const scrollIntoView = Element.prototype.scrollIntoView;
+    Element.prototype.scrollIntoView = function(arg) {
+        if (arg && typeof arg === "object") arg = Object.assign({}, arg, {behavior: "instant"});
+        return scrollIntoView.call(this, arg);
+    };
+})();
+"""
+
+# Clicks the like button and resolves with its icon's aria-label once it changes
+# (or the timeout passes), so the click and its confirmation cost one round trip.
+CLICK_AND_CONFIRM_JS = """
+const button = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const label = () => {
+    const svg = button.querySelector("svg");
+    return svg ? svg.getAttribute("aria-label") : null;
+};
+const before = label();
+button.scrollIntoView({block: "center", behavior: "instant"});
+button.click();
+
+const started = performance.now();
+const check = () => {
+    const now = label();
+    if (now !== before || performance.now() - started > timeoutMs) done(now);
+    else setTimeout(check, 16);
+};
+queueMicrotask(check);
+"""
+
+
+def install_animation_free_mode(driver):
+    """
+    Register the animation-free stylesheet/script for every document the tab loads
+    and emulate prefers-reduced-motion. Works on Selenium's Chrome driver and CdpDriver.
+    """
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": ANIMATION_FREE_JS})
+        driver.execute_cdp_cmd("Emulation.setEmulatedMedia", {
+            "features": [{"name": "prefers-reduced-motion", "value": "reduce"}]
+        })
+        print("Animation-free rendering enabled.")
+        return True
+    except Exception as e:
+        print(f"Could not enable animation-free rendering: {e}")
+        return False
+
+
+def scroll_into_view_instant(driver, element, block="center"):
+    driver.execute_script(
+        "arguments[0].scrollIntoView({block: arguments[1], behavior: 'instant'});",
+        element,
+        block
+    )
+
+
+def click_and_confirm(driver, button, timeout_ms=LIKE_CONFIRM_TIMEOUT_MS):
+    """
+    Click a like button and return its aria-label afterwards ("Unlike" once liked).
+    """
+    return driver.execute_async_script(CLICK_AND_CONFIRM_JS, button, timeout_ms)
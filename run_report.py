@@ -0,0 +1,90 @@
+import os
+import json
+import time
+import glob
+import statistics
+
+
+RUNS_DIR = "runs"
+
+
+def new_run_id():
+    return time.strftime("%Y%m%d-%H%M%S")
+
+
+def new_run_report(run_id, script):
+    return {
+        "run_id": run_id,
+        "script": script,
+        "started_at": time.time(),
+        "finished_at": None,
+        "links": {},        # shortcode -> per-link stats
+    }
+
+
+def run_report_path(run_id):
+    return os.path.join(RUNS_DIR, f"{run_id}.json")
+
+
+def save_run_report(report):
+    try:
+        os.makedirs(RUNS_DIR, exist_ok=True)
+        with open(run_report_path(report["run_id"]), "w") as f:
+            json.dump(report, f, indent=2)
+    except Exception as e:
+        print(f"Error saving run report: {e}")
+
+
+def load_run_report(run_id=None):
+    """
+    Load a run report by id, or the most recent one if run_id is None.
+    """
+    if run_id is None:
+        paths = sorted(glob.glob(os.path.join(RUNS_DIR, "*.json")))
+        if not paths:
+            return None
+        path = paths[-1]
+    else:
+        path = run_report_path(run_id)
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def summarize_ready_times(report):
+    """
+    Print time-to-ready stats across the links of a run.
+    """
+    times = [s["ready_s"] for s in report["links"].values() if s.get("ready_s") is not None]
+    not_ready = sum(1 for s in report["links"].values() if "ready_s" in s and s["ready_s"] is None)
+    if not times:
+        print("Time to ready: no data")
+        return
+    print(f"Time to ready: median {statistics.median(times):.2f}s | "
+          f"max {max(times):.2f}s | {len(times)} links | {not_ready} never ready")
+
+
+def completed_links(report):
+    """
+    Shortcodes a run finished, so a resumed run can skip them.
+    """
+    return {shortcode for shortcode, stats in report["links"].items() if stats.get("done")}
+
+
+def summarize_scan(report):
+    """
+    Print comment counts and walk throughput for a dry-run scan. Walk time already
+    excludes the post-scroll load waits, which are shown separately.
+    """
+    walked = [s for s in report["links"].values() if s.get("scroll_s")]
+    if not walked:
+        print("Scan: no data")
+        return
+    comments = sum(s["comments_seen"] for s in walked)
+    seconds = sum(s["scroll_s"] for s in walked)
+    would_like = sum(s.get("would_like", 0) for s in walked)
+    settle = sum(s.get("settle_s", 0) for s in walked)
+    print(f"Scan: {comments} comments over {len(walked)} links | {would_like} would be liked | "
+          f"{comments / seconds:.1f} comments/s ({seconds:.1f}s walking threads, {settle:.1f}s load waits excluded)")
@@ -0,0 +1,20 @@
+from comment_rules import CompiledRules, MATCHED, evaluate_batch
+
+
+def decide(raw, *comments):
+    return evaluate_batch(CompiledRules(raw), list(comments))
+
+
+def test_keywords_respect_word_boundaries():
+    rules = {"keywords_any": ["fire"]}
+    assert decide(rules, ("a", "fire!"), ("a", "campfire"), ("a", "fireman")) == [MATCHED, "no_keyword", "no_keyword"]
+
+
+def test_symbol_keywords_match_next_to_text():
+    rules = {"keywords_any": ["🔥", "#goals"]}
+    assert decide(rules, ("a", "love🔥"), ("a", "my#goals"), ("a", "#goalsss")) == [MATCHED, MATCHED, "no_keyword"]
+
+
+def test_rule_values_are_nfkc_normalized():
+    rules = {"keywords_none": ["ＰＲＯＭＯ"], "usernames_deny": ["@Ｓpam"]}
+    assert decide(rules, ("a", "promo code"), ("spam", "hi"), ("b", "hi")) == ["blocked_keyword", "denied_user", MATCHED]
@@ -0,0 +1,14 @@
+from links import canonicalize_link, is_share_link
+
+
+def test_username_prefix_is_dropped():
+    assert canonicalize_link("https://www.instagram.com/someuser/reel/ABC/?igsh=1") == (
+        "ABC", "https://www.instagram.com/reel/ABC/")
+
+
+def test_share_links_are_not_shortcodes():
+    for url in ["https://www.instagram.com/share/reel/BAxyz/", "instagram.com/share/BAxyz/"]:
+        assert canonicalize_link(url) == (None, None)
+        assert is_share_link(url)
+    assert not is_share_link("https://www.instagram.com/shared_user/p/XYZ/")
+    assert canonicalize_link("https://www.instagram.com/shared_user/p/XYZ/")[0] == "XYZ"
@@ -0,0 +1,64 @@
+from watermarks import advance_watermark, is_processed, view_below_cutoff
+
+
+def ids(*timestamps):
+    return [(str(int(ts)), ts) for ts in timestamps]
+
+
+def test_is_processed_by_id_or_cutoff():
+    watermark = {"cutoff_ts": 70.0, "processed": {"105": 105.0}}
+    assert is_processed(("105", 105.0), watermark)
+    assert is_processed(("60", 60.0), watermark)
+    assert is_processed((None, 70.0), watermark)
+    assert not is_processed(("110", 110.0), watermark)
+    assert not is_processed((None, None), watermark)
+    assert not is_processed(("60", 60.0), {})
+
+
+def test_view_below_cutoff_needs_newest_first_order():
+    watermark = {"cutoff_ts": 70.0}
+    assert view_below_cutoff(ids(65, 60), watermark)
+    assert not view_below_cutoff(ids(60, 65), watermark)        # ranked view
+    assert not view_below_cutoff(ids(75, 60), watermark)
+    assert not view_below_cutoff([("1", None), ("2", 60.0)], watermark)
+    assert not view_below_cutoff(ids(65, 60), {})
+
+
+def test_early_stop_moves_cutoff_past_new_comments():
+    watermark = {"cutoff_ts": 70.0, "processed": {}}
+    visit = ids(110, 105, 65, 60)                                 # stopped on the 65/60 view
+    advance_watermark(watermark, visit, set(ids(110, 105)), True, 2)
+    assert watermark["cutoff_ts"] == 110.0
+    assert watermark["processed"] == {}
+
+
+def test_failed_comment_caps_cutoff_and_is_retried():
+    watermark = {}
+    visit = ids(50, 40, 30, 20, 10)
+    advance_watermark(watermark, visit, set(ids(50, 40, 20, 10)), True, 4)
+    assert watermark["cutoff_ts"] == 20.0
+    assert not is_processed(("30", 30.0), watermark)
+    assert is_processed(("40", 40.0), watermark)
+
+
+def test_ranked_walk_only_records_ids():
+    watermark = {}
+    visit = ids(50, 10, 40, 20)
+    advance_watermark(watermark, visit, set(visit), True, 4)
+    assert "cutoff_ts" not in watermark
+    assert set(watermark["processed"]) == {"50", "10", "40", "20"}
+    assert not is_processed(("5", 5.0), watermark)              # never loaded, not done
+
+
+def test_unfinished_walk_keeps_cutoff():
+    watermark = {"cutoff_ts": 70.0, "processed": {}}
+    advance_watermark(watermark, ids(110, 105, 100), set(ids(110, 105, 100)), False, 3)
+    assert watermark["cutoff_ts"] == 70.0
+    assert set(watermark["processed"]) == {"110", "105", "100"}
+
+
+def test_overlapping_views_are_read_once():
+    watermark = {}
+    visit = ids(50, 40, 40, 30, 30, 20)
+    advance_watermark(watermark, visit, set(visit), True, 4)
+    assert watermark["cutoff_ts"] == 50.0
@@ -0,0 +1,136 @@
+import json
+import time
+
+
+WATERMARK_FILE = "comment_watermarks.json"
+
+# Returns [commentId, timestampSeconds] for each comment block in one round trip.
+# The ID comes from the comment permalink (/p/<code>/c/<id>/), the time from <time datetime>.
+COMMENT_IDENTITY_JS = """
+return arguments[0].map(block => {
+    let commentId = null;
+    for (const a of block.querySelectorAll("a[href*='/c/']")) {
+        const m = a.getAttribute("href").match(/\\/c\\/(\\d+)/);
+        if (m) { commentId = m[1]; break; }
+    }
+    const t = block.querySelector("time[datetime]");
+    const ts = t ? Date.parse(t.getAttribute("datetime")) / 1000 : null;
+    return [commentId, isNaN(ts) ? null : ts];
+});
+"""
+
+
+def load_watermarks(path=None):
+    try:
+        with open(path or WATERMARK_FILE, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Error loading watermarks: {e}")
+        return {}
+
+
+def save_watermarks(watermarks, path=None):
+    try:
+        with open(path or WATERMARK_FILE, "w") as f:
+            json.dump(watermarks, f, indent=2)
+    except Exception as e:
+        print(f"Error saving watermarks: {e}")
+
+
+def read_comment_identities(driver, comment_blocks):
+    """
+    Return a (comment_id, timestamp) pair per block, (None, None) where it can't be read.
+    """
+    if not comment_blocks:
+        return []
+    try:
+        identities = driver.execute_script(COMMENT_IDENTITY_JS, comment_blocks)
+        return [tuple(pair) for pair in identities]
+    except Exception as e:
+        print(f"  ✗ Could not read comment identities: {e}")
+        return [(None, None)] * len(comment_blocks)
+
+
+def handled_action(action):
+    """
+    True for outcomes that count as processed: liked, already liked or skipped by rules.
+    Failed clicks, errors and unreadable buttons are retried on the next visit.
+    """
+    return action in ("liked", "already_liked") or action.startswith("rule_")
+
+
+def is_processed(identity, watermark):
+    """
+    True if a previous visit handled this comment: either its ID was recorded, or it is
+    at or below the timestamp cutoff, which only a visit that walked the whole thread sets.
+    """
+    if not watermark:
+        return False
+    comment_id, ts = identity
+    if comment_id is not None and comment_id in watermark.get("processed", {}):
+        return True
+    cutoff = watermark.get("cutoff_ts")
+    return ts is not None and cutoff is not None and ts <= cutoff
+
+
+def _newest_first(identities):
+    # All timestamps known and non-increasing down the page
+    timestamps = [ts for _, ts in identities]
+    return all(ts is not None for ts in timestamps) and all(a >= b for a, b in zip(timestamps, timestamps[1:]))
+
+
+def view_below_cutoff(identities, watermark):
+    """
+    True if every comment in view is at or below the cutoff and the view is ordered
+    newest first, so everything further down is older still. Ranked (non-chronological)
+    views never qualify and are walked in full.
+    """
+    cutoff = (watermark or {}).get("cutoff_ts")
+    if cutoff is None or not identities or not _newest_first(identities):
+        return False
+    return all(ts <= cutoff for _, ts in identities)
+
+
+def advance_watermark(watermark, identities, handled, walked_to_end, new_count):
+    """
+    Record the comments handled on this visit and add new_count to the running total.
+    identities are all (id, ts) pairs read on the visit in page order, handled the subset
+    that was processed. The cutoff only moves when the thread was walked to the end as
+    one contiguous newest-first run, so nothing older than the cutoff can have been left
+    unloaded; in ranked order only the ID set grows. It never moves past a comment that
+    was seen but not handled. Mutates and returns watermark.
+    """
+    visit = list(dict.fromkeys(identities))  # page order, overlapping views read once
+    cutoff = watermark.get("cutoff_ts")
+    # Comments the previous visits already covered (e.g. the view the walk stopped on) aren't failures
+    failed = [ts for identity in visit
+              if identity not in handled and not is_processed(identity, watermark)
+              for ts in [identity[1]] if ts is not None]
+
+    processed = watermark.setdefault("processed", {})
+    for comment_id, ts in handled:
+        if comment_id is not None:
+            processed[comment_id] = ts
+
+    if walked_to_end and visit and _newest_first(visit):
+        covered = [ts for _, ts in handled if ts is not None] + ([cutoff] if cutoff is not None else [])
+        if failed:
+            covered = [ts for ts in covered if ts < min(failed)]
+        if covered:
+            watermark["cutoff_ts"] = max(covered)
+
+    # IDs under the cutoff are covered by it and needn't be kept
+    cutoff = watermark.get("cutoff_ts")
+    if cutoff is not None:
+        for comment_id in [c for c, ts in processed.items() if ts is not None and ts <= cutoff]:
+            del processed[comment_id]
+
+    # Pre-cutoff format: a newest-seen mark that also covered unprocessed comments
+    watermark.pop("newest_ts", None)
+    watermark.pop("newest_id", None)
+
+    watermark["seen_count"] = watermark.get("seen_count", 0) + new_count
+    watermark["updated_at"] = time.time()
+    return watermark